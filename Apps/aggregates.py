@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+class ReleaseDateStats:
+    """
+    Conteos de estrenos precalculados por mes, día de la semana, año y mes×año.
+    Se calculan una sola vez al cargar el dataset; los conteos acumulados por año
+    permiten responder filtros por rango de años en tiempo constante.
+    """
+
+    def __init__(self, release_dates):
+        dates = pd.to_datetime(pd.Series(release_dates), errors='coerce').dropna()
+        years = dates.dt.year.to_numpy(dtype=np.int64)
+
+        self.min_year = int(years.min()) if years.size else 0
+        self.max_year = int(years.max()) if years.size else -1
+        self.n_years = self.max_year - self.min_year + 1
+        year_pos = years - self.min_year
+
+        # Matrices (mes × año) y (día de la semana × año); la fila 0 de meses queda vacía
+        self.month_year = np.bincount(
+            dates.dt.month.to_numpy() * self.n_years + year_pos, minlength=13 * self.n_years
+        ).reshape(13, self.n_years)
+        self.weekday_year = np.bincount(
+            dates.dt.dayofweek.to_numpy() * self.n_years + year_pos, minlength=7 * self.n_years
+        ).reshape(7, self.n_years)
+
+        self.by_month = self.month_year.sum(axis=1)
+        self.by_weekday = self.weekday_year.sum(axis=1)
+        self.by_year = self.month_year.sum(axis=0)
+
+        # Acumulados por año con una columna inicial en cero para consultas por rango
+        self._month_cumsum = np.pad(self.month_year.cumsum(axis=1), ((0, 0), (1, 0)))
+        self._weekday_cumsum = np.pad(self.weekday_year.cumsum(axis=1), ((0, 0), (1, 0)))
+
+    def _range_count(self, cumsum, row: int, year_from: int = None, year_to: int = None) -> int:
+        lo = 0 if year_from is None else int(np.clip(year_from - self.min_year, 0, self.n_years))
+        hi = self.n_years if year_to is None else int(np.clip(year_to - self.min_year + 1, 0, self.n_years))
+        if hi <= lo:
+            return 0
+        return int(cumsum[row, hi] - cumsum[row, lo])
+
+    def count_month(self, month: int, year_from: int = None, year_to: int = None) -> int:
+        if not 1 <= month <= 12:
+            return 0
+        return self._range_count(self._month_cumsum, month, year_from, year_to)
+
+    def count_weekday(self, weekday: int, year_from: int = None, year_to: int = None) -> int:
+        if not 0 <= weekday <= 6:
+            return 0
+        return self._range_count(self._weekday_cumsum, weekday, year_from, year_to)
+
+    def count_year(self, year: int) -> int:
+        if not self.min_year <= year <= self.max_year:
+            return 0
+        return int(self.by_year[year - self.min_year])
@@ -0,0 +1,121 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+
+from Apps.ranking import top_n
+
+# Vecinos por película que se piden por defecto (igual que el índice exacto de Apps/model.py);
+# los índices guardados sin `k` usan este valor
+DEFAULT_K = 50
+
+
+class LSHIndex:
+    """
+    Índice aproximado de vecinos (ANN) para catálogos grandes.
+
+    Las películas se representan con embeddings densos de baja dimensión (SVD
+    truncado del espacio TF-IDF) y se indexan con LSH de hiperplanos aleatorios:
+    `n_tables` tablas de `n_bits` bits cada una. Una consulta reúne los candidatos
+    de su cubeta en cada tabla (más las cubetas a distancia de Hamming 1 si
+    `probes` está activo) y los reordena con el producto punto exacto de los
+    embeddings, en lugar de comparar contra todo el catálogo.
+
+    `k` es la cantidad de vecinos que se piden cuando hay que reordenarlos (boosts
+    por voto o popularidad), el equivalente al top-K del índice exacto.
+    """
+
+    def __init__(self, embeddings: np.ndarray, n_tables: int = 8, n_bits: int = 12, seed: int = 0,
+                 planes: np.ndarray = None, probes: bool = True, k: int = DEFAULT_K):
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.k = k
+        if planes is None:
+            rng = np.random.default_rng(seed)
+            planes = rng.standard_normal((n_tables, n_bits, self.embeddings.shape[1])).astype(np.float32)
+        self.planes = planes
+        self.probes = probes
+
+        # Por tabla: códigos ordenados y la posición de película de cada uno (búsqueda con searchsorted)
+        codes = self._codes(self.embeddings)
+        self._orders = np.argsort(codes, axis=1, kind='stable')
+        self._sorted_codes = np.take_along_axis(codes, self._orders, axis=1)
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def n_tables(self):
+        return self.planes.shape[0]
+
+    @property
+    def n_bits(self):
+        return self.planes.shape[1]
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        # Código de cubeta (n_tables × n) a partir del signo de la proyección en cada hiperplano
+        bits = np.einsum('tbd,nd->tnb', self.planes, vectors) > 0
+        return bits.astype(np.int64) @ (np.int64(1) << np.arange(self.n_bits, dtype=np.int64))
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        codes = self._codes(vector[None, :])[:, 0]
+        if self.probes:
+            # Cubeta propia + las que difieren en un solo bit (multi-probe)
+            flips = np.concatenate([[0], np.int64(1) << np.arange(self.n_bits, dtype=np.int64)])
+            probe_codes = codes[:, None] ^ flips[None, :]
+        else:
+            probe_codes = codes[:, None]
+        found = []
+        for table in range(self.n_tables):
+            lo = np.searchsorted(self._sorted_codes[table], probe_codes[table], side='left')
+            hi = np.searchsorted(self._sorted_codes[table], probe_codes[table], side='right')
+            found.extend(self._orders[table, start:stop] for start, stop in zip(lo, hi) if stop > start)
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def query(self, vector: np.ndarray, k: int, exclude: int = None):
+        """
+        Devuelve (posiciones, scores) de los k vecinos aproximados de `vector`,
+        ordenados de mayor a menor score. `exclude` es una posición a descartar
+        (normalmente la propia película).
+        """
+        candidates = self.candidates(np.asarray(vector, dtype=np.float32))
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        scores = self.embeddings[candidates] @ vector
+        top = top_n(scores, k)
+        return candidates[top], scores[top]
+
+    def query_movie(self, movie_index: int, k: int):
+        return self.query(self.embeddings[movie_index], k, exclude=movie_index)
+
+
+def build_embeddings(tfidf_matrix, genres_matrix, n_components: int = 128, genre_weight: float = 0.25,
+                     seed: int = 0) -> np.ndarray:
+    """
+    Reduce el espacio TF-IDF a `n_components` dimensiones con SVD truncado.
+    Se concatenan contenido y géneros (escalados por sqrt(genre_weight)) para que el
+    producto punto de los embeddings aproxime el mismo score del índice exacto:
+    contenido + genre_weight * géneros.
+    """
+    combined = sp.hstack([tfidf_matrix, np.sqrt(genre_weight) * genres_matrix]).tocsr()
+    n_components = max(1, min(n_components, min(combined.shape) - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=seed)
+    return svd.fit_transform(combined).astype(np.float32)
+
+
+def build_ann_index(tfidf_matrix, genres_matrix, n_components: int = 128, n_tables: int = 8, n_bits: int = 12,
+                    genre_weight: float = 0.25, seed: int = 0, k: int = DEFAULT_K) -> LSHIndex:
+    embeddings = build_embeddings(tfidf_matrix, genres_matrix, n_components, genre_weight, seed)
+    return LSHIndex(embeddings, n_tables=n_tables, n_bits=n_bits, seed=seed, k=k)
+
+
+def save_ann_index(path: str, index: LSHIndex):
+    with open(path, 'wb') as f:
+        np.savez(f, embeddings=index.embeddings, planes=index.planes, probes=np.array(index.probes),
+                 k=np.array(index.k))
+
+
+def load_ann_index(path: str) -> LSHIndex:
+    with np.load(path, allow_pickle=False) as data:
+        k = int(data["k"]) if "k" in data.files else DEFAULT_K
+        return LSHIndex(data["embeddings"], planes=data["planes"], probes=bool(data["probes"]), k=k)
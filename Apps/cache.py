@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def artifact_version(*paths) -> str:
+    """
+    Versión de los artefactos cargados (dataset, índice de vecinos, ...): hash de la
+    ruta, el tamaño y la fecha de modificación de cada archivo. Cambia con cada
+    despliegue o regeneración, y con ella todas las claves de la caché de respuestas.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        if path is None:
+            continue
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+def _json_default(value):
+    # Escalares de NumPy/pandas a tipos nativos; el resto (fechas, ...) como texto
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _normalize_argument(value):
+    # Mismas respuestas para "Toy Story", "toy  story" o "TOY STORY"
+    if isinstance(value, str):
+        return ' '.join(value.casefold().split())
+    return value
+
+
+class SqliteResponseBackend:
+    """
+    Backend compartido de la caché de respuestas en SQLite: varios workers en la
+    misma máquina apuntan al mismo archivo y reutilizan los resultados de los demás.
+    Las respuestas se guardan serializadas en JSON.
+
+    Para que el archivo no crezca sin límite, las escrituras borran las filas
+    vencidas como mucho una vez cada `purge_interval` segundos y, con `max_rows`,
+    también las más próximas a vencer por encima de ese tope.
+    """
+
+    def __init__(self, path: str, max_rows: int = None, purge_interval: float = 60.0):
+        self.max_rows = max_rows
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=_json_default), expires_at)
+            )
+            now = time.time()
+            if now - self._last_purge >= self.purge_interval:
+                self._purge(now)
+            self._conn.commit()
+
+    def _purge(self, now: float):
+        # Se llama con el lock tomado, dentro de la transacción de `set`
+        self._last_purge = now
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        if self.max_rows is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_rows,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Caché LRU en proceso de las respuestas de MovieSys, acotada en cantidad de
+    entradas (`maxsize`) y en antigüedad (`ttl`, segundos). La clave combina el
+    nombre del método, la versión de los artefactos de la instancia y los
+    argumentos normalizados. Con `backend` se consulta además una caché compartida
+    antes de recalcular.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600, backend: SqliteResponseBackend = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, movie_sys, method: str, args, kwargs) -> str:
+        arguments = [_normalize_argument(a) for a in args]
+        arguments += [(name, _normalize_argument(kwargs[name])) for name in sorted(kwargs)]
+        return json.dumps([method, getattr(movie_sys, 'version', None), arguments], ensure_ascii=False, default=_json_default)
+
+    def lookup(self, movie_sys, method: str, *args, **kwargs):
+        """
+        Respuesta en la caché local o None, sin calcular ni contar fallos: permite
+        servir los aciertos sin pasar por el executor de CPU.
+        """
+        return self._local_get(self._key(movie_sys, method, args, kwargs), time.time())
+
+    def _local_get(self, key: str, now: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def call(self, movie_sys, method: str, *args, **kwargs):
+        """Devuelve movie_sys.<method>(*args, **kwargs) desde la caché o calculándolo."""
+        key = self._key(movie_sys, method, args, kwargs)
+        now = time.time()
+        value = self._local_get(key, now)
+        if value is not None:
+            return value
+
+        value = self.backend.get(key) if self.backend is not None else None
+        if value is not None:
+            with self._lock:
+                self.shared_hits += 1
+            self._store(key, value, now + self.ttl)
+            return value
+
+        value = getattr(movie_sys, method)(*args, **kwargs)
+        with self._lock:
+            self.misses += 1
+        self._store(key, value, now + self.ttl)
+        if self.backend is not None:
+            self.backend.set(key, value, now + self.ttl)
+        return value
+
+    def _store(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ETL_functs.text_store import TextStore, ids_digest, text_store_path
+
+# Columnas del dataset que usan los endpoints de MovieSys (el resto no se mantiene en memoria)
+CATALOG_COLUMNS = ['id', 'title', 'genres', 'vote_average', 'vote_count', 'popularity', 'imdb_id',
+                   'release_date', 'release_year', 'return', 'budget', 'revenue']
+# Columnas que solo se usan para construir índices y se descartan después
+INDEX_COLUMNS = ['cast', 'crew']
+# Columnas numéricas que pasan a float32 si no cambia ningún valor mostrado
+FLOAT_COLUMNS = ['vote_average', 'popularity', 'return', 'budget', 'revenue']
+# Columnas de texto que se guardan como categoría si así ocupan menos
+TEXT_COLUMNS = ['title', 'imdb_id']
+GENRE_SEPARATOR = '|'
+
+
+def load_overviews(movies_df_path: str, movies_df: pd.DataFrame) -> TextStore:
+    """
+    Sinopsis del catálogo: mapeadas desde el archivo generado por el ETL si existe y
+    corresponde al dataset (misma huella de ids, en el mismo orden), o copiadas a un
+    buffer contiguo a partir del DataFrame.
+    """
+    path = text_store_path(movies_df_path)
+    if os.path.exists(path):
+        store = TextStore.open(path)
+        if len(store) == len(movies_df) and store.ids is not None and store.ids == ids_digest(movies_df['id']):
+            return store
+        print(f"Warning: {path} no corresponde al dataset; se reconstruyen las sinopsis en memoria.")
+    return TextStore.from_values(movies_df.get('overview', pd.Series([''] * len(movies_df))))
+
+
+def exact_floats(values) -> np.ndarray:
+    """
+    Valores en float64 tal como se muestran: un float32 se convierte por su
+    representación más corta ('5.3' y no 5.300000190734863), que es la del valor
+    original cuando compact_catalog lo redujo.
+    """
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        return values.astype(str).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def _compact_float(column: pd.Series) -> pd.Series:
+    # float32 solo si todos los valores conservan su representación (sin pérdida visible)
+    values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+    reduced = values.astype(np.float32)
+    if np.array_equal(exact_floats(reduced), values, equal_nan=True):
+        return pd.Series(reduced, index=column.index, name=column.name)
+    return column
+
+
+def _compact_text(column: pd.Series) -> pd.Series:
+    # Categoría solo si hay suficientes repetidos (títulos duplicados) para que ocupe menos
+    categorical = column.astype('category')
+    if categorical.memory_usage(deep=True) < column.memory_usage(deep=True):
+        return categorical
+    return column
+
+
+def compact_catalog(movies_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja en memoria solo las columnas que usan los endpoints (más las de índices),
+    con tipos compactos: géneros como categoría (combinación unida por '|'),
+    cantidad de votos en float32, año en int16, voto, popularidad, montos y retorno
+    en float32 cuando ningún valor cambia (ver exact_floats) y título e imdb_id como
+    categoría cuando ocupa menos.
+    """
+    columns = [c for c in CATALOG_COLUMNS + INDEX_COLUMNS if c in movies_df.columns]
+    movies_df = movies_df[columns].copy()
+    if 'genres' in movies_df.columns:
+        movies_df['genres'] = pd.Categorical([
+            GENRE_SEPARATOR.join(genres) if isinstance(genres, list) else '' for genres in movies_df['genres']
+        ])
+    if 'vote_count' in movies_df.columns:
+        movies_df['vote_count'] = pd.to_numeric(movies_df['vote_count'], errors='coerce').astype(np.float32)
+    if 'release_year' in movies_df.columns and movies_df['release_year'].notna().all():
+        movies_df['release_year'] = movies_df['release_year'].astype(np.int16)
+    for column in FLOAT_COLUMNS:
+        if column in movies_df.columns:
+            movies_df[column] = _compact_float(movies_df[column])
+    for column in TEXT_COLUMNS:
+        if column in movies_df.columns:
+            movies_df[column] = _compact_text(movies_df[column])
+    return movies_df
+
+
+def genre_list(value) -> list:
+    # Inversa de la codificación de compact_catalog
+    return value.split(GENRE_SEPARATOR) if isinstance(value, str) and value else []
+
+
+def memory_report(movies_df: pd.DataFrame, **extras) -> dict:
+    """Bytes por columna del DataFrame (deep) y de las estructuras adicionales indicadas."""
+    columns = {column: int(size) for column, size in movies_df.memory_usage(deep=True).items()}
+    extras = {name: int(size) for name, size in extras.items()}
+    return {
+        "columns": columns,
+        "dataframe_total": sum(columns.values()),
+        "extras": extras,
+        "total": sum(columns.values()) + sum(extras.values()),
+    }
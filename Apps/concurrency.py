@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Marca de fin del iterador recorrido por `_Stream`
+_DONE = object()
+
+
+class ExecutorFull(Exception):
+    """El executor ya tiene `max_workers + max_queue` tareas en curso o en espera."""
+
+
+class BoundedExecutor:
+    """
+    Pool de hilos dedicado con cola acotada para usar desde endpoints async.
+
+    Como mucho `max_workers` tareas corren a la vez y otras `max_queue` esperan
+    turno; por encima de eso `run` lanza ExecutorFull de inmediato (la API responde
+    429) en lugar de encolar sin límite. Un lugar se libera cuando termina la tarea
+    en el hilo, no cuando se cancela la solicitud que la espera: el hilo sigue
+    ocupado hasta entonces. Por eso el contador de pendientes lleva lock.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorFull(f"Executor '{self.name}' saturado")
+            self.pending += 1
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _submit(self, func, *args):
+        return self._executor.submit(func, *args)
+
+    async def run(self, func, *args, **kwargs):
+        self._acquire()
+        try:
+            future = self._submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stream(self, iterator):
+        """
+        Recorre un iterador bloqueante en el pool, un elemento por vez, ocupando
+        un solo lugar durante toda la respuesta. El lugar se reserva al llamar a
+        `stream` (ExecutorFull antes de enviar la respuesta) y se libera al agotarse,
+        al cerrarse o al descartarse el stream sin recorrerlo (ver _Stream).
+        """
+        self._acquire()
+        return _Stream(self, iterator)
+
+    def stats(self) -> dict:
+        return {"max_workers": self.max_workers, "max_queue": self.max_queue,
+                "pending": self.pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _Stream:
+    """
+    Iterador async de `BoundedExecutor.stream`. Libera su lugar una sola vez: al
+    agotarse o fallar el iterador, con `aclose` o, si la respuesta se abandona
+    antes de empezar (desconexión del cliente), al recolectarse. Si hay un
+    elemento calculándose en el pool, el lugar se libera cuando ese cálculo termina.
+    """
+
+    def __init__(self, executor: BoundedExecutor, iterator):
+        self._executor = executor
+        self._iterator = iter(iterator)
+        self._future = None
+        self._released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._released:
+            raise StopAsyncIteration
+        try:
+            self._future = self._executor._submit(next, self._iterator, _DONE)
+            item = await asyncio.wrap_future(self._future)
+        except BaseException:
+            self.close()
+            raise
+        if item is _DONE:
+            self.close()
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self):
+        self.close()
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        if self._future is not None and not self._future.done():
+            self._future.add_done_callback(self._executor._release)
+        else:
+            self._executor._release()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,77 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from Apps.neighbors import content_vectorizer
+from Apps.ranking import top_n
+
+
+class DescriptionIndex:
+    """
+    Búsqueda de películas a partir de una descripción libre.
+
+    Conserva del TF-IDF de contenido ('genres' + 'overview' + 'cast' + 'crew') el
+    vocabulario, los pesos IDF y la matriz de documentos normalizada (L2), guardada
+    por columnas (CSC) para que una consulta solo recorra las columnas de sus términos.
+    La consulta se vectoriza igual que los documentos y el score de cada película
+    es su similitud de coseno: un único producto matriz dispersa × vector.
+    """
+
+    def __init__(self, terms, idf: np.ndarray, matrix, ids: np.ndarray = None):
+        self.terms = np.asarray(terms)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.matrix = sp.csc_matrix(matrix, dtype=np.float32)
+        self.ids = ids
+        self.vocabulary = {term: column for column, term in enumerate(self.terms.tolist())}
+        # Mismo análisis de texto (tokens, minúsculas, stop words) que el vectorizador ajustado
+        self._analyzer = content_vectorizer().build_analyzer()
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer, tfidf_matrix, ids=None):
+        """A partir del TfidfVectorizer ajustado y de la matriz que generó (build_tfidf_matrices)."""
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, column in vectorizer.vocabulary_.items():
+            terms[column] = term
+        ids = np.asarray(ids, dtype=np.int64) if ids is not None else None
+        return cls(terms.astype(str), vectorizer.idf_, normalize(tfidf_matrix), ids)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def vectorize(self, text: str):
+        """Columnas y pesos TF-IDF (normalizados L2) de los términos conocidos de `text`."""
+        columns = [self.vocabulary[token] for token in self._analyzer(text) if token in self.vocabulary]
+        if not columns:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        columns, counts = np.unique(columns, return_counts=True)
+        weights = counts * self.idf[columns]
+        return columns, weights / np.linalg.norm(weights)
+
+    def scores(self, text: str) -> np.ndarray:
+        columns, weights = self.vectorize(text)
+        if columns.size == 0:
+            return np.zeros(len(self), dtype=np.float32)
+        return self.matrix[:, columns] @ weights.astype(np.float32)
+
+    def query(self, text: str, k: int = 10):
+        """Posiciones y scores de las k películas más similares (solo las que comparten algún término)."""
+        scores = self.scores(text)
+        top = top_n(scores, k, scores <= 0)
+        return top, scores[top]
+
+
+def save_description_index(path: str, index: DescriptionIndex):
+    matrix = index.matrix
+    arrays = dict(terms=index.terms, idf=index.idf, data=matrix.data, indices=matrix.indices,
+                  indptr=matrix.indptr, shape=np.array(matrix.shape, dtype=np.int64))
+    if index.ids is not None:
+        arrays["ids"] = np.asarray(index.ids, dtype=np.int64)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_description_index(path: str) -> DescriptionIndex:
+    with np.load(path, allow_pickle=False) as data:
+        matrix = sp.csc_matrix((data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"]))
+        ids = data["ids"] if "ids" in data.files else None
+        return DescriptionIndex(data["terms"], data["idf"], matrix, ids)
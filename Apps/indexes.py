@@ -0,0 +1,203 @@
+import bisect
+import unicodedata
+
+import numpy as np
+
+from Apps.ranking import top_n
+
+# Cantidad de bits en 1 de cada byte (popcount por tabla, compatible con cualquier versión de NumPy)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def normalize_text(text) -> str:
+    """
+    Normaliza un texto para búsquedas: sin tildes, en minúsculas (casefold)
+    y con los espacios colapsados.
+    """
+    if not isinstance(text, str):
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+def build_title_index(titles) -> dict:
+    """
+    Construye un índice título normalizado → posiciones de fila en movies_df.
+    Los títulos duplicados conservan todas sus posiciones en orden de aparición.
+    """
+    index = {}
+    for position, title in enumerate(titles):
+        index.setdefault(normalize_text(title), []).append(position)
+    return index
+
+
+class PersonIndex:
+    """
+    Índice invertido de personas (actores o directores): nombre normalizado →
+    posiciones de fila de sus películas, más el nombre canónico para mostrar.
+    Admite búsqueda exacta y por prefijo (del nombre completo o de cualquiera
+    de sus palabras, p. ej. "hanks" → "Tom Hanks").
+    """
+
+    def __init__(self, people_lists):
+        self.movies = {}
+        self.display_names = {}
+        for position, people in enumerate(people_lists):
+            for name in people:
+                key = normalize_text(name)
+                if not key:
+                    continue
+                self.display_names.setdefault(key, name.strip())
+                positions = self.movies.setdefault(key, [])
+                # Evitar duplicados si la persona aparece dos veces en la misma película
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        # Claves ordenadas para búsquedas por prefijo con bisect
+        prefix_keys = set()
+        for key in self.movies:
+            words = key.split(' ')
+            for i in range(len(words)):
+                prefix_keys.add((' '.join(words[i:]), key))
+        self._prefix_keys = sorted(prefix_keys)
+
+    def __len__(self):
+        return len(self.movies)
+
+    def exact(self, name: str):
+        key = normalize_text(name)
+        return key if key in self.movies else None
+
+    def prefix(self, prefix: str, limit: int = None) -> list:
+        """
+        Devuelve los nombres normalizados que empiezan por `prefix`, ordenados por
+        cantidad de películas (de mayor a menor) y luego alfabéticamente.
+        """
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._prefix_keys, (prefix, ''))
+        matches = set()
+        # Acceso por índice desde `start` (islice recorrería la lista desde el principio)
+        prefix_keys = self._prefix_keys
+        for i in range(start, len(prefix_keys)):
+            key, name = prefix_keys[i]
+            if not key.startswith(prefix):
+                break
+            matches.add(name)
+        ranked = sorted(matches, key=lambda name: (-len(self.movies[name]), name))
+        return ranked[:limit] if limit is not None else ranked
+
+    def lookup(self, name: str):
+        """
+        Resuelve un nombre a (nombre canónico, posiciones de sus películas):
+        primero por coincidencia exacta y, si no hay, por el mejor prefijo.
+        Devuelve None si no hay coincidencias.
+        """
+        key = self.exact(name)
+        if key is None:
+            candidates = self.prefix(name, limit=1)
+            if not candidates:
+                return None
+            key = candidates[0]
+        return self.display_names[key], self.movies[key]
+
+
+def trigrams(text: str) -> set:
+    """Trigramas de caracteres del texto normalizado, con relleno de espacios en los bordes."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas de caracteres sobre claves normalizadas (títulos),
+    para búsquedas tolerantes a errores de tipeo sin calcular distancias de edición
+    contra todo el catálogo: una consulta solo recorre las listas de sus trigramas y
+    puntúa a los candidatos con la similitud de Jaccard entre conjuntos de trigramas.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        postings = {}
+        self.counts = np.zeros(len(self.keys), dtype=np.int32)
+        for key_id, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.counts[key_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        # Listas de ids por trigrama concatenadas en un solo arreglo (estilo CSR)
+        self._gram_ids = {gram: i for i, gram in enumerate(postings)}
+        lengths = np.array([len(ids) for ids in postings.values()], dtype=np.int64)
+        self._offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self._postings = (np.concatenate([np.asarray(ids, dtype=np.int32) for ids in postings.values()])
+                          if postings else np.empty(0, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.0) -> list:
+        """
+        Devuelve hasta `limit` pares (clave, score) ordenados por similitud de
+        trigramas con `query` (de mayor a menor), con score > min_score.
+        """
+        query_grams = trigrams(normalize_text(query))
+        grams = [self._gram_ids[g] for g in query_grams if g in self._gram_ids]
+        if not grams or limit <= 0:
+            return []
+        matches = np.concatenate([self._postings[self._offsets[g]:self._offsets[g + 1]] for g in grams])
+        # Trigramas compartidos por clave (conteo lineal, sin ordenar las coincidencias)
+        shared = np.bincount(matches, minlength=len(self.keys))
+        candidates = np.flatnonzero(shared)
+        shared = shared[candidates]
+        scores = shared / (len(query_grams) + self.counts[candidates] - shared)
+        top = top_n(scores, limit, scores <= min_score)
+        return [(self.keys[candidates[i]], float(scores[i])) for i in top]
+
+
+class GenreBitset:
+    """
+    Géneros de cada película como matriz multi-hot empaquetada en bits
+    (N × ceil(G/8) bytes), para calcular la similitud de Jaccard de una película
+    contra todo el catálogo en una sola operación vectorizada.
+
+    Las filas se guardan en orden de desempate (popularidad y cantidad de votos
+    descendentes), de modo que los empates de Jaccard los resuelve top_n por posición.
+    """
+
+    def __init__(self, genre_lists, popularity, vote_count):
+        genre_lists = [genres if isinstance(genres, list) else [] for genres in genre_lists]
+        self.genres = sorted({genre for genres in genre_lists for genre in genres})
+        columns = {genre: column for column, genre in enumerate(self.genres)}
+        n_movies = len(genre_lists)
+
+        multi_hot = np.zeros((n_movies, max(len(self.genres), 1)), dtype=bool)
+        rows = [row for row, genres in enumerate(genre_lists) for _ in genres]
+        cols = [columns[genre] for genres in genre_lists for genre in genres]
+        multi_hot[rows, cols] = True
+
+        popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64), nan=-np.inf)
+        vote_count = np.nan_to_num(np.asarray(vote_count, dtype=np.float64), nan=-np.inf)
+        self.order = np.lexsort((np.arange(n_movies), -vote_count, -popularity))
+        self.rank = np.empty(n_movies, dtype=np.int64)
+        self.rank[self.order] = np.arange(n_movies)
+        self.bits = np.packbits(multi_hot[self.order], axis=1)
+        self.counts = multi_hot.sum(axis=1)[self.order].astype(np.int32)
+
+    def __len__(self):
+        return self.bits.shape[0]
+
+    def similar(self, position: int, n: int) -> np.ndarray:
+        """
+        Posiciones de las n películas con mayor Jaccard de géneros respecto de
+        `position` (al menos un género en común, sin la propia película),
+        desempatando por popularidad y cantidad de votos.
+        """
+        ranked = self.rank[position]
+        intersection = _POPCOUNT[self.bits & self.bits[ranked]].sum(axis=1, dtype=np.int32)
+        union = self.counts + self.counts[ranked] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros(len(union), dtype=np.float64), where=union > 0)
+        exclude = intersection == 0
+        exclude[ranked] = True
+        return self.order[top_n(jaccard, n, exclude)]
@@ -1,44 +1,367 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import os
+import time
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from Apps.cache import ResponseCache, SqliteResponseBackend
+from Apps.concurrency import BoundedExecutor, ExecutorFull
+from Apps.metrics import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram, stage
 from Apps.models2 import MovieSys
+from Apps.profiling import SamplingProfiler
+from Apps.reload import HotReloader
 
 # Configuración del archivo y enlace de Google Drive
-movies_df_path = 'Datasets/test.csv'
-similarity_path = "Datasets/weighted_similarity.pkl"  # ID del archivo
+# Se usa el dataset columnar (Parquet) si existe; si no, el CSV heredado
+movies_df_path = 'Datasets/movies.parquet' if os.path.exists('Datasets/movies.parquet') else 'Datasets/test.csv'
+# 'exact' (por defecto) o 'ann' para catálogos grandes
+neighbors_mode = os.environ.get("NEIGHBORS_MODE", "exact")
+# Índice de top-K vecinos generado por Apps/model.py (solo hace falta en modo 'exact')
+neighbors_path = "Datasets/neighbors.bin" if neighbors_mode == 'exact' else None
+ann_path = "Datasets/ann.npz"  # Índice aproximado (LSH) generado por Apps/model.py
+# Índice de búsqueda por descripción (vocabulario + IDF + matriz TF-IDF), opcional
+# (MovieSys lo omite mientras no exista y la recarga lo toma cuando aparece)
+description_path = "Datasets/description.npz"
+# Recomendaciones materializadas por `python -m Apps.materialized`, opcional: si existe, /recomendacion
+# (con las ponderaciones por defecto) se responde con una búsqueda por id y solo calcula en vivo los fallos
+recommendations_path = "Datasets/recommendations.sqlite"
 
 # Inicializar MovieSys Sistema-de-Recomendacion-de-Peliculas\main.py
-movie_sys = MovieSys(movies_df_path, similarity_path)
+# Con LAZY_LOAD (por defecto) solo se carga el dataset antes de aceptar conexiones; los
+# artefactos pesados se cargan en segundo plano y mientras tanto las recomendaciones
+# usan el respaldo por géneros. READY_TIMEOUT es cuánto espera un endpoint que los necesita.
+lazy_load = os.environ.get("LAZY_LOAD", "1") != "0"
+ready_timeout = float(os.environ.get("READY_TIMEOUT", 10))
+# FUZZY_TITLES=1 (desactivado por defecto): los endpoints por título resuelven un título mal
+# escrito al más parecido si su similitud de trigramas supera FUZZY_MIN_SCORE. La respuesta no
+# indica la corrección, por eso es opcional; /buscar siempre tolera errores de tipeo
+fuzzy_titles = os.environ.get("FUZZY_TITLES", "0") == "1"
+fuzzy_min_score = float(os.environ.get("FUZZY_MIN_SCORE", 0.4))
+movie_sys = MovieSys(movies_df_path, neighbors_path, ann_path=ann_path, neighbors_mode=neighbors_mode, lazy=lazy_load,
+                     fuzzy_titles=fuzzy_titles, fuzzy_min_score=fuzzy_min_score, description_path=description_path,
+                     recommendations_path=recommendations_path)
+if lazy_load:
+    movie_sys.load_in_background()
+
+# Caché LRU de respuestas (tamaño y TTL configurables). Con RESPONSE_CACHE_PATH los
+# workers comparten además una caché en SQLite, acotada a RESPONSE_CACHE_MAX_ROWS filas.
+shared_cache_path = os.environ.get("RESPONSE_CACHE_PATH")
+shared_cache_max_rows = int(os.environ.get("RESPONSE_CACHE_MAX_ROWS", 100_000))
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 3600)),
+    backend=SqliteResponseBackend(shared_cache_path, max_rows=shared_cache_max_rows) if shared_cache_path else None,
+)
+
+
+
+def build_movie_sys():
+    # Instancia nueva con los artefactos actuales en disco (carga y validación completas);
+    # se reutiliza el resolvedor de pósters para conservar su caché y su pool de conexiones
+    return MovieSys(movies_df_path, neighbors_path, poster_resolver=movie_sys.posters,
+                    ann_path=ann_path, neighbors_mode=neighbors_mode,
+                    fuzzy_titles=fuzzy_titles, fuzzy_min_score=fuzzy_min_score, description_path=description_path,
+                    recommendations_path=recommendations_path)
+
+
+def swap_movie_sys(new_movie_sys):
+    # Reemplazo atómico de la referencia: las solicitudes nuevas usan la nueva versión
+    global movie_sys
+    movie_sys = new_movie_sys
+    response_cache.clear()
+
+
+# Recarga en caliente: POST /admin/reload (con ADMIN_TOKEN) o revisión periódica de los
+# archivos cada RELOAD_WATCH_INTERVAL segundos (0 = desactivada)
+reloader = HotReloader(build_movie_sys, movie_sys, on_swap=swap_movie_sys,
+                       paths=movie_sys.artifact_paths)
+admin_token = os.environ.get("ADMIN_TOKEN")
+reload_watch_interval = float(os.environ.get("RELOAD_WATCH_INTERVAL", 0))
+if reload_watch_interval > 0:
+    reloader.watch(reload_watch_interval)
+
+# Executors dedicados: cálculo de MovieSys (CPU) y consultas de pósters (I/O), cada
+# uno con su límite de concurrencia y su cola; al llenarse la API responde 429
+cpu_executor = BoundedExecutor("cpu", int(os.environ.get("CPU_WORKERS", min(4, os.cpu_count() or 1))),
+                               int(os.environ.get("CPU_QUEUE", 32)))
+io_executor = BoundedExecutor("io", int(os.environ.get("IO_WORKERS", 16)), int(os.environ.get("IO_QUEUE", 128)))
+
+# Métricas en formato de texto de Prometheus (GET /metrics): latencia por ruta, etapas
+# internas de MovieSys (Apps/metrics.py) y estado de la carga, la caché y los executors
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Latencia de las solicitudes por ruta",
+                            ("method", "route", "status"))
+LOAD_SECONDS = Gauge("moviesys_load_seconds", "Duración de cada etapa de la carga de MovieSys", ("stage",))
+READY = Gauge("moviesys_ready", "1 si los artefactos pesados están cargados")
+ARTIFACT_BYTES = Gauge("moviesys_artifact_bytes", "Tamaño en disco de los artefactos cargados", ("artifact",))
+CATALOG_BYTES = Gauge("moviesys_catalog_bytes", "Memoria del catálogo y las estructuras auxiliares")
+CACHE_REQUESTS = Counter("response_cache_requests_total", "Consultas a la caché de respuestas", ("result",))
+CACHE_ENTRIES = Gauge("response_cache_entries", "Entradas en la caché local de respuestas")
+EXECUTOR_PENDING = Gauge("executor_pending_tasks", "Tareas en curso o en cola por executor", ("executor",))
+MATERIALIZED_LOOKUPS = Counter("materialized_lookups_total", "Búsquedas en las recomendaciones materializadas",
+                               ("result",))
+EXECUTOR_REJECTED = Counter("executor_rejected_total", "Solicitudes rechazadas (429) por executor", ("executor",))
+
+# Perfilador por muestreo opcional: con PROFILE_SLOW_MS > 0, las solicitudes que tardan
+# más que ese umbral dejan un perfil de pilas colapsadas en PROFILE_DIR
+profile_slow_ms = float(os.environ.get("PROFILE_SLOW_MS", 0))
+profiler = (SamplingProfiler(profile_slow_ms / 1000, os.environ.get("PROFILE_DIR", "profiles"))
+            if profile_slow_ms > 0 else None)
 
 # Crear instancia de FastAPI
 app = FastAPI()
 
+
+class Instrumentation:
+    """
+    Middleware ASGI: latencia de cada solicitud hasta el último byte enviado (incluidas
+    las respuestas en streaming) y, con el perfilador activo, perfil de las lentas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            if profiler is not None:
+                with profiler.profile(f"{scope['method']} {scope['path']}"):
+                    await self.app(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            # Se etiqueta por plantilla de ruta ("/recomendacion/{titulo}") para acotar la cardinalidad
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"],
+                                    route=route.path if route is not None else "desconocida", status=status)
+
+
+app.add_middleware(Instrumentation)
+
+
+class NotReady(Exception):
+    pass
+
+
+@app.exception_handler(NotReady)
+async def not_ready(request: Request, exc: NotReady):
+    return JSONResponse(status_code=503, content={"error": str(exc), **movie_sys.loading_status()},
+                        headers={"Retry-After": "5"})
+
+
+async def wait_ready():
+    # Espera (sin bloquear el event loop) a que terminen de cargarse los artefactos pesados
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ready_timeout
+    while not movie_sys.ready:
+        if movie_sys.load_error is not None or loop.time() >= deadline:
+            raise NotReady("Los datos del sistema todavía se están cargando")
+        await asyncio.sleep(0.05)
+
+
+@app.exception_handler(ExecutorFull)
+async def executor_full(request: Request, exc: ExecutorFull):
+    return JSONResponse(status_code=429, content={"error": str(exc)}, headers={"Retry-After": "1"})
+
+
+async def cached_cpu(method: str, *args, **kwargs):
+    # Los aciertos de caché se sirven sin pasar por el executor; el resto se calcula en el pool de CPU
+    value = response_cache.lookup(movie_sys, method, *args, **kwargs)
+    if value is not None:
+        return value
+    return await cpu_executor.run(response_cache.call, movie_sys, method, *args, **kwargs)
+
+
+async def cached_light(method: str, *args, **kwargs):
+    # Endpoints livianos: se calculan en el event loop, salvo que haya que ir a la caché
+    # compartida en SQLite (I/O de disco y posible espera por el lock), que va al executor de I/O
+    if response_cache.backend is None:
+        return response_cache.call(movie_sys, method, *args, **kwargs)
+    value = response_cache.lookup(movie_sys, method, *args, **kwargs)
+    if value is not None:
+        return value
+    return await io_executor.run(response_cache.call, movie_sys, method, *args, **kwargs)
+
+
+def invalid_n_recommendations(n_recommendations: int):
+    # Solo los K vecinos almacenados son candidatos: un n mayor se recortaría sin aviso, así que se rechaza
+    limit = movie_sys.max_recommendations
+    if n_recommendations < 1 or (limit is not None and n_recommendations > limit):
+        rango = f"entre 1 y {limit}" if limit is not None else "al menos 1"
+        return JSONResponse(status_code=422, content={"error": f"n_recommendations debe ser {rango}"})
+    return None
+
+
+async def with_posters(method: str, result: dict) -> dict:
+    # Los pósters (I/O de red, con su propia caché) se resuelven en el executor de I/O, fuera del pool de CPU
+    if "recommendations" not in result:
+        return result
+    recommendations = result["recommendations"]
+    with stage(method, 'posters'):
+        posters = await io_executor.run(movie_sys.posters.resolve_many, [r["imdb_id"] for r in recommendations])
+    return {"recommendations": [{**r, "poster": poster} for r, poster in zip(recommendations, posters)]}
+
+
+class RecomendacionBatch(BaseModel):
+    titulos: list[str] = []
+    ids: list[int | str] = []
+    n_recommendations: int = 5
+    posters: bool = False
+    vote_weight: float = 0.0
+    popularity_weight: float = 0.0
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Bienvenido a la API de consulta de películas"}
 
+@app.get("/health")
+async def health():
+    # Liveness: el proceso responde, aunque los artefactos pesados sigan cargándose
+    return {"status": "ok", **movie_sys.loading_status()}
+
+@app.get("/ready")
+async def ready():
+    # Readiness: 200 solo cuando todos los artefactos están cargados
+    status = movie_sys.loading_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+# Endpoints livianos (búsquedas O(1) en índices precalculados): se resuelven en el event loop (ver cached_light)
 @app.get("/cantidad_filmaciones_mes/{mes}")
-def cantidad_filmaciones_mes(mes: str):
-    return movie_sys.cantidad_filmaciones_mes(mes)
+async def cantidad_filmaciones_mes(mes: str, anio_desde: int | None = None, anio_hasta: int | None = None):
+    return await cached_light("cantidad_filmaciones_mes", mes, anio_desde, anio_hasta)
 
 @app.get("/cantidad_filmaciones_dia/{dia}")
-def cantidad_filmaciones_dia(dia: str):
-    return movie_sys.cantidad_filmaciones_dia(dia)
+async def cantidad_filmaciones_dia(dia: str, anio_desde: int | None = None, anio_hasta: int | None = None):
+    return await cached_light("cantidad_filmaciones_dia", dia, anio_desde, anio_hasta)
 
 @app.get("/score_titulo/{titulo}")
-def score_titulo(titulo: str):
-    return movie_sys.score_titulo(titulo)
+async def score_titulo(titulo: str):
+    return await cached_light("score_titulo", titulo)
 
 @app.get("/votos_titulo/{titulo}")
-def votos_titulo(titulo: str):
-    return movie_sys.votos_titulo(titulo)
+async def votos_titulo(titulo: str):
+    return await cached_light("votos_titulo", titulo)
+
+@app.get("/buscar/{q}")
+async def buscar(q: str, limit: int = 10):
+    # Búsqueda de títulos tolerante a errores (índice de trigramas, sin recorrer todo el catálogo)
+    return await cached_light("buscar", q, limit)
 
 @app.get("/get_actor/{nombre_actor}")
-def get_actor(nombre_actor: str):
-    return movie_sys.get_actor(nombre_actor)
+async def get_actor(nombre_actor: str):
+    await wait_ready()
+    return await cached_cpu("get_actor", nombre_actor)
 
 @app.get("/get_director/{nombre_director}")
-def get_director(nombre_director: str):
-    return movie_sys.get_director(nombre_director)
+async def get_director(nombre_director: str):
+    await wait_ready()
+    return await cached_cpu("get_director", nombre_director)
 
 @app.get("/recomendacion/{titulo}")
-def recomendacion(titulo: str, n_recommendations: int = 5):
-    return movie_sys.recomendacion(titulo, n_recommendations)
+async def recomendacion(titulo: str, n_recommendations: int = 5, vote_weight: float = 0.0, popularity_weight: float = 0.0):
+    # Los pesos de voto y popularidad se aplican en cada consulta sobre el score de contenido almacenado.
+    # Durante la carga en segundo plano se responde con el respaldo por géneros (sin esperar)
+    invalid = invalid_n_recommendations(n_recommendations)
+    if invalid is not None:
+        return invalid
+    result = await cached_cpu("recomendacion", titulo, n_recommendations, vote_weight, popularity_weight, posters=False)
+    return await with_posters("recomendacion", result)
+
+# Máximo de imdb_id por consulta a /posters
+MAX_POSTER_IDS = 50
+
+@app.get("/posters")
+async def posters(imdb_ids: str):
+    # URLs de los pósters de exactamente los imdb_id pedidos (separados por coma), por id:
+    # el cliente los une a las recomendaciones que ya tiene sin volver a calcularlas
+    ids = [i for i in dict.fromkeys(imdb_ids.split(",")) if i][:MAX_POSTER_IDS]
+    urls = await io_executor.run(movie_sys.posters.resolve_many, ids)
+    return {"posters": dict(zip(ids, urls))}
+
+@app.get("/recomendacion_descripcion/{descripcion}")
+async def recomendacion_descripcion(descripcion: str, n_recommendations: int = 5):
+    # Películas similares a una descripción libre (TF-IDF de la consulta × matriz de documentos)
+    await wait_ready()
+    result = await cached_cpu("recomendacion_descripcion", descripcion, n_recommendations, posters=False)
+    return await with_posters("recomendacion_descripcion", result)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    # Aciertos (locales y compartidos), fallos y ocupación de la caché de respuestas
+    return response_cache.stats()
+
+@app.get("/metrics")
+async def metrics():
+    # Los valores de la instancia actual (tras una recarga, los de la nueva) se leen al exportar
+    for name, seconds in movie_sys.load_seconds.items():
+        LOAD_SECONDS.set(seconds, stage=name)
+    READY.set(int(movie_sys.ready))
+    for name, size in movie_sys.artifact_sizes().items():
+        ARTIFACT_BYTES.set(size, artifact=name)
+    CATALOG_BYTES.set(movie_sys.memory_report()["total"])
+    cache = response_cache.stats()
+    CACHE_REQUESTS.set(cache["hits"], result="hit")
+    CACHE_REQUESTS.set(cache["shared_hits"], result="shared_hit")
+    CACHE_REQUESTS.set(cache["misses"], result="miss")
+    CACHE_ENTRIES.set(cache["size"])
+    if movie_sys.materialized is not None:
+        MATERIALIZED_LOOKUPS.set(movie_sys.materialized.hits, result="hit")
+        MATERIALIZED_LOOKUPS.set(movie_sys.materialized.misses, result="miss")
+    for executor in (cpu_executor, io_executor):
+        EXECUTOR_PENDING.set(executor.pending, executor=executor.name)
+        EXECUTOR_REJECTED.set(executor.rejected, executor=executor.name)
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/memory")
+async def memory():
+    # Memoria por columna del catálogo y de las estructuras auxiliares del worker
+    return movie_sys.memory_report()
+
+@app.get("/executors/stats")
+async def executors_stats():
+    # Tareas en curso o en cola y solicitudes rechazadas (429) de cada executor
+    return {"cpu": cpu_executor.stats(), "io": io_executor.stats()}
+
+@app.post("/admin/reload", status_code=202)
+async def admin_reload(x_admin_token: str | None = Header(default=None)):
+    # Carga la nueva versión en segundo plano y la intercambia solo si pasa la validación
+    if admin_token is None or x_admin_token != admin_token:
+        return JSONResponse(status_code=403, content={"error": "No autorizado"})
+    if not reloader.reload_in_background():
+        return JSONResponse(status_code=409, content={"error": "Ya hay una recarga en curso", **reloader.status()})
+    return {"message": "Recarga iniciada", **reloader.status()}
+
+@app.get("/admin/reload")
+async def admin_reload_status():
+    return reloader.status()
+
+@app.post("/recomendacion/batch")
+async def recomendacion_batch(batch: RecomendacionBatch):
+    # Un resultado JSON por línea (NDJSON), generado en el pool de CPU a medida que se envía la respuesta;
+    # el lote ocupa un lugar del executor (o recibe 429) antes de empezar a responder
+    invalid = invalid_n_recommendations(batch.n_recommendations)
+    if invalid is not None:
+        return invalid
+    results = movie_sys.recomendacion_batch(batch.titulos, batch.ids, batch.n_recommendations, batch.posters,
+                                            vote_weight=batch.vote_weight, popularity_weight=batch.popularity_weight)
+    stream = cpu_executor.stream(results)
+
+    async def lines():
+        try:
+            async for result in stream:
+                yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,154 @@
+"""
+Tabla materializada de recomendaciones.
+
+Para un catálogo estático, la respuesta de `MovieSys.recomendacion` (colección
+primero y luego los vecinos con mayor score) es determinista. Este job la calcula
+para todas las películas en paralelo (un proceso por núcleo, cada uno con su propio
+MovieSys sobre los artefactos mapeados en memoria) y la guarda en SQLite con el id
+de película como clave; MovieSys la sirve con una búsqueda por clave primaria.
+
+Uso (desde la raíz del repositorio):
+    python -m Apps.materialized --dataset Datasets/movies.parquet --neighbors Datasets/neighbors.bin \\
+        --output Datasets/recommendations.sqlite --n 10 --procesos 4
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Apps.posters import PosterResolver
+
+# Filas por tarea del pool (una pasada vectorizada sobre el índice de vecinos por tarea)
+CHUNK_SIZE = 2048
+
+
+class RecommendationStore:
+    """
+    Recomendaciones precalculadas en SQLite: una fila por película (id → ids de las
+    `n_recommendations` recomendadas, en orden, como int64 little-endian) y una tabla
+    `meta` con la huella de los artefactos con los que se calcularon (ver
+    `MovieSys.recommendation_fingerprint`). Como el resultado para n es el prefijo
+    del resultado para N, sirve cualquier consulta con n <= n_recommendations.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.fingerprint = meta.get("fingerprint")
+        self.n_recommendations = int(meta.get("n_recommendations", 0))
+
+    def get(self, movie_id: int, n_recommendations: int):
+        """Ids de las n primeras recomendaciones de la película, o None si no está materializada."""
+        if n_recommendations > self.n_recommendations:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT recommendations FROM recommendations WHERE id = ?",
+                                     (int(movie_id),)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return np.frombuffer(row[0], dtype='<i8')[:n_recommendations]
+
+    def stats(self) -> dict:
+        return {"path": self.path, "n_recommendations": self.n_recommendations,
+                "hits": self.hits, "misses": self.misses}
+
+
+def write_recommendation_store(path: str, rows, fingerprint: str, n_recommendations: int):
+    """
+    Escribe el almacén a un archivo temporal y lo renombra al terminar, para que
+    los workers de la API nunca abran uno a medio escribir. `rows` es un iterable
+    de (id de película, ids recomendados).
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE recommendations (id INTEGER PRIMARY KEY, recommendations BLOB NOT NULL)")
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("fingerprint", fingerprint), ("n_recommendations", str(n_recommendations)),
+            ("created_at", str(time.time())),
+        ])
+        conn.executemany(
+            "INSERT OR REPLACE INTO recommendations (id, recommendations) VALUES (?, ?)",
+            ((int(movie_id), np.asarray(ids, dtype='<i8').tobytes()) for movie_id, ids in rows)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+# Instancia de MovieSys de cada proceso del pool (se carga una vez en el inicializador)
+_worker_movie_sys = None
+
+
+def _init_worker(movies_df_path: str, neighbors_path: str, ann_path: str, neighbors_mode: str):
+    global _worker_movie_sys
+    from Apps.models2 import MovieSys
+    _worker_movie_sys = MovieSys(movies_df_path, neighbors_path, PosterResolver(), ann_path=ann_path,
+                                 neighbors_mode=neighbors_mode)
+
+
+def _compute_chunk(positions: np.ndarray, n_recommendations: int):
+    movie_sys = _worker_movie_sys
+    ids = movie_sys.movies_df['id'].to_numpy(dtype=np.int64)
+    batch = movie_sys._recommend_positions_batch(positions, n_recommendations)
+    return [(int(ids[position]), ids[recommended].astype(np.int64)) for position, recommended in batch.items()]
+
+
+def build_recommendation_store(movies_df_path: str, neighbors_path: str, output_path: str,
+                               n_recommendations: int = 10, processes: int = None, ann_path: str = None,
+                               neighbors_mode: str = 'exact', chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Calcula las recomendaciones (con las ponderaciones por defecto) de todas las
+    películas repartiendo bloques de filas entre `processes` procesos y las guarda
+    en `output_path`. Devuelve la cantidad de películas materializadas.
+    """
+    from Apps.models2 import MovieSys
+    movie_sys = MovieSys(movies_df_path, neighbors_path, PosterResolver(), ann_path=ann_path,
+                         neighbors_mode=neighbors_mode)
+    fingerprint = movie_sys.recommendation_fingerprint()
+    n_movies = len(movie_sys.movies_df)
+    chunks = [np.arange(start, min(start + chunk_size, n_movies)) for start in range(0, n_movies, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), initializer=_init_worker,
+                             initargs=(movies_df_path, neighbors_path, ann_path, neighbors_mode)) as pool:
+        results = pool.map(_compute_chunk, chunks, [n_recommendations] * len(chunks))
+        rows = (row for chunk_rows in results for row in chunk_rows)
+        write_recommendation_store(output_path, rows, fingerprint, n_recommendations)
+    return n_movies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', default='Datasets/movies.parquet')
+    parser.add_argument('--neighbors', default='Datasets/neighbors.bin')
+    parser.add_argument('--ann', default=None, help="Índice ANN (solo con --mode ann)")
+    parser.add_argument('--mode', default='exact', choices=['exact', 'ann'])
+    parser.add_argument('--output', default='Datasets/recommendations.sqlite')
+    parser.add_argument('--n', type=int, default=10, help="Recomendaciones por película (máximo servible)")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto, uno por núcleo)")
+    parser.add_argument('--tamano-bloque', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n_movies = build_recommendation_store(args.dataset, args.neighbors, args.output, args.n, args.procesos,
+                                          args.ann, args.mode, args.tamano_bloque)
+    print(f"{n_movies} películas materializadas en {args.output} en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,44 +2,32 @@
 import pandas as pd
 from surprise import Dataset, Reader, SVD
 from surprise.model_selection import train_test_split
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import MinMaxScaler
+from ETL_functs.dataset_io import cargar_dataset
+from Apps.neighbors import build_tfidf_matrices, build_neighbor_index, save_neighbor_index
+from Apps.ann import build_ann_index, save_ann_index
+from Apps.description import DescriptionIndex, save_description_index
 
 # Cargar el archivo CSV
-movies_df = pd.read_csv('Datasets/test.csv')
+movies_df = cargar_dataset('Datasets/test.csv')
 
 # Normalizar 'vote_count' y 'popularity' para ponderación
 scaler = MinMaxScaler()
 movies_df[['vote_count', 'popularity']] = scaler.fit_transform(movies_df[['vote_count', 'popularity']])
 
-# Crear una columna combinada para 'genres', 'overview', 'cast', y 'crew' para similitud de contenido
-movies_df['content'] = (
-    movies_df['genres'].fillna('') + " " +
-    movies_df['overview'].fillna('') + " " +
-    movies_df['cast'].fillna('') + " " +
-    movies_df['crew'].fillna('')
-)
+# Vectorizar con TF-IDF el texto combinado ('genres', 'overview', 'cast', 'crew') y los géneros
+tfidf_matrix, genres_matrix, (tfidf, _) = build_tfidf_matrices(movies_df, return_vectorizers=True)
 
-# Vectorizar el texto combinado con TF-IDF
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(movies_df['content'])
+# Calcular únicamente los top-K vecinos de cada película por bloques de filas,
+# sin materializar las matrices de similitud N×N
+neighbor_index = build_neighbor_index(tfidf_matrix, genres_matrix, k=50, ids=movies_df['id'])
+save_neighbor_index('Datasets/neighbors.bin', neighbor_index)
 
-# Vectorizar únicamente 'genres' para calcular la similitud específica de géneros
-tfidf_genres = TfidfVectorizer(stop_words='english')
-genres_matrix = tfidf_genres.fit_transform(movies_df['genres'].fillna(''))
+# Índice aproximado opcional (SVD + LSH) para servir con NEIGHBORS_MODE=ann en catálogos grandes
+save_ann_index('Datasets/ann.npz', build_ann_index(tfidf_matrix, genres_matrix, k=neighbor_index.k))
 
-# Calcular la similitud de coseno en ambas matrices (contenido y géneros)
-content_similarity = cosine_similarity(tfidf_matrix)
-genre_similarity = cosine_similarity(genres_matrix)
-
-# Construir la matriz de similitud ponderada sumando los pesos de 'vote_average', 'popularity' y 'genres'
-weighted_similarity = (
-    content_similarity +
-    (movies_df['vote_average'].values[:, None] * 0.25) +
-    (movies_df['popularity'].values[:, None] * 0.5) +
-    (genre_similarity * 0.25)  # Ponderación de géneros
-)
+# Vocabulario, IDF y matriz de documentos del TF-IDF ajustado, para recomendar a partir de una descripción libre
+save_description_index('Datasets/description.npz', DescriptionIndex.from_vectorizer(tfidf, tfidf_matrix, movies_df['id']))
 
 # Filtrado colaborativo (SVD)
 reader = Reader(rating_scale=(1, 10))
@@ -61,10 +49,9 @@ def recomendacion(title, n_recommendations=5):
     # Obtener la colección de la película (si existe)
     collection_name = movies_df.loc[movie_index, 'belongs_to_collection']
     
-    # Obtener índices de películas similares
-    similarity_scores = list(enumerate(weighted_similarity[movie_index]))
-    similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
-    similar_movies_indices = [i[0] for i in similarity_scores[1:n_recommendations + 10]]  # Obtener suficientes películas
+    # Obtener índices de películas similares (ya ordenados y sin la propia película)
+    neighbor_indices, _ = neighbor_index.row(movie_index)
+    similar_movies_indices = neighbor_indices[:n_recommendations + 9]  # Obtener suficientes películas
     
     # Filtrar y priorizar recomendaciones
     recommendations = movies_df.iloc[similar_movies_indices]
@@ -1,15 +1,94 @@
+import hashlib
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
 import pandas as pd
-import requests
+from Apps.aggregates import ReleaseDateStats
+from Apps.ann import load_ann_index
+from Apps.cache import artifact_version
+from Apps.catalog import INDEX_COLUMNS, compact_catalog, exact_floats, genre_list, load_overviews, memory_report
+from Apps.description import load_description_index
+from Apps.indexes import normalize_text, build_title_index, PersonIndex, GenreBitset, TrigramIndex
+from Apps.materialized import RecommendationStore
+from Apps.metrics import stage
+from Apps.neighbors import load_neighbor_index
+from Apps.posters import PosterResolver, default_poster_resolver
+from Apps.ranking import top_n, top_n_rows
+from ETL_functs.dataset_io import cargar_dataset
+from ETL_functs.text_store import text_store_path
 
 class MovieSys:
-    def __init__(self, movies_df_path: str, similarity_path: str):
-        # Cargar el DataFrame de películas
-        self.movies_df = pd.read_csv(movies_df_path)
-        self.weighted_similarity = pd.read_pickle(similarity_path)
-        if 'release_date' in self.movies_df.columns:
-            self.movies_df['release_date'] = pd.to_datetime(self.movies_df['release_date'], format='%Y-%m-%d', errors='coerce')
-        else:
-            print("Warning: La columna 'release_date' no existe en el archivo CSV.")
+    def __init__(self, movies_df_path: str, neighbors_path: str, poster_resolver: PosterResolver = None,
+                 ann_path: str = None, neighbors_mode: str = 'exact', lazy: bool = False,
+                 fuzzy_titles: bool = False, fuzzy_min_score: float = 0.4, description_path: str = None,
+                 recommendations_path: str = None):
+        """
+        Con `recommendations_path` (tabla materializada por Apps/materialized.py),
+        `recomendacion` con las ponderaciones por defecto se responde con una búsqueda
+        por id en SQLite y solo se calcula en vivo si la película no está materializada.
+        El almacén se descarta (con un aviso) si no corresponde a los artefactos cargados.
+
+        `description_path` es el índice de búsqueda por descripción (Apps/description.py);
+        sin él, `recomendacion_descripcion` responde con un error.
+
+        Ambos son opcionales: si la ruta indicada todavía no existe se omiten en esta
+        carga, y como igual forman parte de `artifact_paths`, crearlos después dispara
+        la recarga en caliente.
+
+        Con `fuzzy_titles=True`, un título sin coincidencia exacta se resuelve al más
+        parecido según el índice de trigramas si su similitud supera `fuzzy_min_score`.
+
+        Con `lazy=True` solo se cargan el dataset y los índices livianos; los artefactos
+        pesados (vecinos, índice ANN, índices de actores y directores) se cargan luego
+        con `load_artifacts` / `load_in_background`. Mientras tanto las recomendaciones
+        usan el respaldo por géneros y `ready` es False.
+        """
+        self.movies_df_path = movies_df_path
+        self.description_path = description_path
+        self.recommendations_path = recommendations_path
+        # Modo de vecinos: 'exact' (índice top-K precalculado) o 'ann' (LSH sobre embeddings SVD, ver Apps/ann.py)
+        if neighbors_mode not in ('exact', 'ann'):
+            raise ValueError(f"neighbors_mode debe ser 'exact' o 'ann', no '{neighbors_mode}'")
+        if neighbors_mode == 'ann' and ann_path is None:
+            raise ValueError("neighbors_mode='ann' requiere ann_path")
+        if neighbors_mode == 'exact' and neighbors_path is None:
+            raise ValueError("neighbors_mode='exact' requiere neighbors_path")
+        self.neighbors_mode = neighbors_mode
+        # En modo 'ann' el índice exacto no se usa: no se carga ni se vigila (`neighbors_path` puede ser None)
+        self.neighbors_path = neighbors_path if neighbors_mode == 'exact' else None
+        self.ann_path = ann_path if neighbors_mode == 'ann' else None
+        # Estado de carga de los artefactos pesados (lo reportan /health y /ready) y
+        # duración de cada etapa de la carga en segundos (ver _enter_stage)
+        self.loading_stage = 'dataset'
+        self.load_error = None
+        self.load_started = time.time()
+        self.load_seconds = {}
+        self._stage_started = time.perf_counter()
+        self._ready = threading.Event()
+        self.neighbors = None
+        self.ann = None
+        self.descriptions = None
+        self.materialized = None
+        self.actor_index = None
+        self.director_index = None
+
+        # Cargar el DataFrame de películas (Parquet columnar o CSV heredado, con listas y fechas ya tipadas)
+        self.movies_df = cargar_dataset(movies_df_path)
+        # Sinopsis fuera del DataFrame: buffer contiguo (mapeado desde disco si el ETL generó el archivo)
+        self.overviews = load_overviews(movies_df_path, self.movies_df)
+        # Versión de los artefactos (forma parte de las claves de la caché de respuestas). HotReloader
+        # vigila los mismos archivos (`artifact_paths`), así que ambas versiones son comparables
+        self.artifact_paths = (movies_df_path, self.neighbors_path, self.ann_path, description_path,
+                               recommendations_path)
+        self._artifacts_version = artifact_version(*self.artifact_paths)
+        # Resolución de pósters con pool de conexiones, consultas concurrentes y caché persistente
+        self.posters = poster_resolver if poster_resolver is not None else default_poster_resolver()
+        if 'release_date' not in self.movies_df.columns:
+            print("Warning: La columna 'release_date' no existe en el dataset.")
         # Preprocesar columnas y mapas de meses y días
         self.month_map = {
             "enero": 1, "febrero": 2, "marzo": 3, "abril": 4,
@@ -20,193 +99,541 @@ class MovieSys:
             "lunes": 1, "martes": 2, "miércoles": 3, "jueves": 4,
             "viernes": 5, "sábado": 6, "domingo": 0
         }
-        
+        self._enter_stage('indices')
+        # Índice título normalizado → posiciones de fila, compartido por todos los endpoints por título
+        self.title_index = build_title_index(self.movies_df['title'])
+        # Índice de trigramas de los títulos normalizados para búsqueda tolerante a errores
+        self.title_search = TrigramIndex(self.title_index)
+        self.fuzzy_titles = fuzzy_titles
+        self.fuzzy_min_score = fuzzy_min_score
+        # Índice id → posición y colecciones codificadas como enteros (-1 = sin colección)
+        self.id_index = {str(movie_id): position for position, movie_id in enumerate(self.movies_df['id'])}
+        collection_codes, collections = pd.factorize(self.movies_df['belongs_to_collection'])
+        self.collection_codes = collection_codes.astype(np.int32)
+        order = np.argsort(self.collection_codes, kind='stable')
+        bounds = np.searchsorted(self.collection_codes[order], np.arange(len(collections) + 1))
+        self.collection_members = [order[bounds[c]:bounds[c + 1]] for c in range(len(collections))]
+        # Boosts por película (independientes del par consultado), normalizados a [0, 1]:
+        # se suman al score de contenido de cada candidato en tiempo de consulta
+        self.vote_boost = self._min_max(self.movies_df['vote_average'])
+        self.popularity_boost = self._min_max(self.movies_df['popularity'])
+        # Géneros como matriz de bits para el respaldo por géneros (disponible también durante la carga)
+        self.genre_bitset = GenreBitset(self.movies_df['genres'], pd.to_numeric(self.movies_df['popularity'], errors='coerce'),
+                                        pd.to_numeric(self.movies_df['vote_count'], errors='coerce'))
+        # Conteos de estrenos precalculados (mes, día de la semana, año y mes×año)
+        self.release_stats = ReleaseDateStats(self.movies_df.get('release_date', pd.Series(dtype='datetime64[ns]')))
+        # Catálogo compacto: solo las columnas que usan los endpoints, con tipos reducidos
+        # (la colección ya quedó como código entero y la sinopsis fuera del DataFrame)
+        self.movies_df = compact_catalog(self.movies_df)
+        self._enter_stage('pendiente')
+
+        if not lazy:
+            self.load_artifacts()
 
-    def cantidad_filmaciones_mes(self, mes: str):
+    def load_artifacts(self):
+        """
+        Carga los artefactos pesados; al terminar `ready` pasa a True. Se cargan en
+        variables locales y solo se publican en la instancia una vez validados: si la
+        carga falla, una instancia perezosa sigue con el respaldo por géneros.
+        """
+        try:
+            neighbors = ann = None
+            if self.neighbors_mode == 'exact':
+                # Índice compacto de top-K vecinos (reemplaza la matriz de similitud N×N)
+                self._enter_stage('vecinos')
+                neighbors = load_neighbor_index(self.neighbors_path)
+            else:
+                # Índice aproximado (LSH): reemplaza al exacto, que en este modo no hace falta
+                self._enter_stage('ann')
+                ann = load_ann_index(self.ann_path)
+            descriptions = None
+            if self.description_path is not None and os.path.exists(self.description_path):
+                self._enter_stage('descripciones')
+                descriptions = load_description_index(self.description_path)
+            # Índices invertidos de actores y directores a partir de las listas desanidadas
+            self._enter_stage('personas')
+            actor_index = PersonIndex(self.movies_df['cast'])
+            director_index = PersonIndex(self.movies_df['crew'])
+            self._enter_stage('validacion')
+            self.validate_artifacts(neighbors, ann, descriptions)
+            self.neighbors, self.ann, self.descriptions = neighbors, ann, descriptions
+            self.actor_index, self.director_index = actor_index, director_index
+            # Las listas de reparto y dirección solo hacían falta para construir los índices
+            self.movies_df = self.movies_df.drop(columns=[c for c in INDEX_COLUMNS if c in self.movies_df.columns])
+            # Solo si existe: abrir la ruta con SQLite crearía un archivo vacío
+            if self.recommendations_path is not None and os.path.exists(self.recommendations_path):
+                self._enter_stage('materializadas')
+                self.materialized = self._open_materialized()
+            self._enter_stage('listo')
+            self._ready.set()
+        except Exception as e:
+            self._enter_stage('error')
+            self.load_error = f"{type(e).__name__}: {e}"
+            raise
+
+    def _enter_stage(self, name: str):
+        # Cierra la etapa de carga en curso (registrando su duración) y pasa a `name`
+        now = time.perf_counter()
+        if self.loading_stage != 'pendiente':
+            self.load_seconds[self.loading_stage] = round(now - self._stage_started, 4)
+        self.loading_stage = name
+        self._stage_started = now
+
+    def recommendation_fingerprint(self) -> str:
+        """
+        Huella del contenido del que dependen las recomendaciones (ids del dataset,
+        colecciones, modo y el artefacto de vecinos del modo activo): identifica para qué artefactos se
+        calculó una tabla materializada, aunque cambien las rutas o las fechas.
+        """
+        digest = hashlib.sha1(self.neighbors_mode.encode())
+        digest.update(pd.to_numeric(self.movies_df['id'], errors='coerce').to_numpy(dtype=np.float64).tobytes())
+        digest.update(self.collection_codes.tobytes())
+        if self.neighbors is not None:
+            digest.update(np.ascontiguousarray(self.neighbors.indices).tobytes())
+            digest.update(np.ascontiguousarray(self.neighbors.scores).tobytes())
+        if self.ann is not None:
+            digest.update(str(self.ann.k).encode())
+            digest.update(self.ann.embeddings.tobytes())
+            digest.update(np.ascontiguousarray(self.ann.planes).tobytes())
+        return digest.hexdigest()
+
+    def _open_materialized(self):
+        try:
+            store = RecommendationStore(self.recommendations_path)
+        except sqlite3.Error as e:
+            print(f"Warning: no se pudo abrir {self.recommendations_path} ({e}); se calcula en vivo.")
+            return None
+        if store.fingerprint != self.recommendation_fingerprint():
+            print(f"Warning: {self.recommendations_path} no corresponde a los artefactos cargados; se calcula en vivo.")
+            return None
+        return store
+
+    def artifact_sizes(self) -> dict:
+        """Tamaño en disco (bytes) de cada artefacto configurado que existe."""
+        paths = {"dataset": self.movies_df_path, "overviews": text_store_path(self.movies_df_path),
+                 "neighbors": self.neighbors_path, "ann": self.ann_path,
+                 "descriptions": self.description_path, "recommendations": self.recommendations_path}
+        return {name: os.path.getsize(path) for name, path in paths.items() if path is not None and os.path.exists(path)}
+
+    def validate_artifacts(self, neighbors=None, ann=None, descriptions=None):
+        """
+        Comprueba que los artefactos candidatos correspondan al dataset cargado (cantidad
+        de filas, ids en el mismo orden y posiciones válidas); lanza ValueError si no.
+        """
+        n_movies = len(self.movies_df)
+        if neighbors is not None:
+            if len(neighbors) > n_movies:
+                raise ValueError(f"El índice de vecinos tiene {len(neighbors)} filas y el dataset {n_movies}")
+            if neighbors.ids is not None:
+                expected = pd.to_numeric(self.movies_df['id'].iloc[:len(neighbors)], errors='coerce').to_numpy()
+                if not np.array_equal(np.asarray(neighbors.ids), expected):
+                    raise ValueError("Los ids del índice de vecinos no coinciden con los del dataset")
+            if len(neighbors) and int(np.max(neighbors.indices)) >= n_movies:
+                raise ValueError("El índice de vecinos referencia posiciones fuera del dataset")
+        if ann is not None and len(ann) > n_movies:
+            raise ValueError(f"El índice ANN tiene {len(ann)} filas y el dataset {n_movies}")
+        if descriptions is not None:
+            if len(descriptions) != n_movies:
+                raise ValueError(f"El índice de descripciones tiene {len(descriptions)} filas y el dataset {n_movies}")
+            expected = pd.to_numeric(self.movies_df['id'], errors='coerce').to_numpy()
+            if descriptions.ids is not None and not np.array_equal(descriptions.ids, expected):
+                raise ValueError("Los ids del índice de descripciones no coinciden con los del dataset")
+
+    def memory_report(self) -> dict:
+        """Memoria del catálogo por columna y de las estructuras auxiliares de MovieSys (bytes)."""
+        extras = {
+            "overviews" + (" (mapeado)" if self.overviews.mapped else ""): self.overviews.nbytes,
+            "collection_codes": self.collection_codes.nbytes,
+            "genre_bitset": self.genre_bitset.bits.nbytes + self.genre_bitset.order.nbytes + self.genre_bitset.rank.nbytes,
+            "boosts": self.vote_boost.nbytes + self.popularity_boost.nbytes,
+        }
+        if self.descriptions is not None:
+            matrix = self.descriptions.matrix
+            extras["descriptions"] = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes + self.descriptions.idf.nbytes
+        return memory_report(self.movies_df, **extras)
+
+    def load_in_background(self) -> threading.Thread:
+        def target():
+            try:
+                self.load_artifacts()
+            except Exception as e:
+                print(f"Error al cargar los artefactos de MovieSys: {e}")
+        thread = threading.Thread(target=target, name='moviesys-loader', daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    @property
+    def version(self) -> str:
+        # Las respuestas degradadas (durante la carga) no comparten claves de caché con las definitivas
+        return self._artifacts_version if self.ready else f"{self._artifacts_version}:cargando"
+
+    def loading_status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "stage": self.loading_stage,
+            "error": self.load_error,
+            "elapsed": round(time.time() - self.load_started, 3),
+            "stages": self.load_seconds,
+            "movies": len(self.movies_df),
+        }
+
+
+    @staticmethod
+    def _min_max(column: pd.Series) -> np.ndarray:
+        values = pd.to_numeric(column, errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+        span = values.max() - values.min() if values.size else 0
+        return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+    @staticmethod
+    def _year_range_text(anio_desde: int = None, anio_hasta: int = None) -> str:
+        if anio_desde is not None and anio_hasta is not None:
+            return f" entre {anio_desde} y {anio_hasta}"
+        if anio_desde is not None:
+            return f" desde {anio_desde}"
+        if anio_hasta is not None:
+            return f" hasta {anio_hasta}"
+        return ""
+
+    def cantidad_filmaciones_mes(self, mes: str, anio_desde: int = None, anio_hasta: int = None):
         month_num = self.month_map.get(mes.lower())
         if month_num is None:
             return {"error": "Mes inválido"}
-        month_count = self.movies_df[self.movies_df['release_date'].dt.month == month_num].shape[0]
-        return {"message": f"{month_count} películas fueron estrenadas en el mes de {mes.lower()}"}
+        month_count = self.release_stats.count_month(month_num, anio_desde, anio_hasta)
+        return {"message": f"{month_count} películas fueron estrenadas en el mes de {mes.lower()}{self._year_range_text(anio_desde, anio_hasta)}"}
 
-    def cantidad_filmaciones_dia(self, dia: str):
+    def cantidad_filmaciones_dia(self, dia: str, anio_desde: int = None, anio_hasta: int = None):
         day_num = self.day_map.get(dia.lower())
         if day_num is None:
             return {"error": "Día inválido"}
-        day_count = self.movies_df[self.movies_df['release_date'].dt.dayofweek == day_num].shape[0]
-        return {"message": f"{day_count} películas fueron estrenadas en los días {dia.lower()}"}
+        day_count = self.release_stats.count_weekday(day_num, anio_desde, anio_hasta)
+        return {"message": f"{day_count} películas fueron estrenadas en los días {dia.lower()}{self._year_range_text(anio_desde, anio_hasta)}"}
     
+    def _find_movie(self, titulo: str):
+        """
+        Resuelve un título a la posición de fila de la película en movies_df
+        (la primera si el título está duplicado). Devuelve None si no existe.
+        """
+        positions = self.title_index.get(normalize_text(titulo))
+        if not positions and self.fuzzy_titles:
+            # Respaldo tolerante a errores de tipeo: el título más parecido por trigramas
+            matches = self.title_search.search(titulo, limit=1, min_score=self.fuzzy_min_score)
+            positions = self.title_index[matches[0][0]] if matches else None
+        return positions[0] if positions else None
+
+    def buscar(self, q: str, limit: int = 10):
+        """
+        Búsqueda de títulos tolerante a errores de tipeo: candidatos ordenados por
+        similitud de trigramas con `q` (títulos duplicados aparecen una vez por película).
+        """
+        with stage('buscar', 'busqueda'):
+            matches = [(position, score) for key, score in self.title_search.search(q, limit=limit)
+                       for position in self.title_index[key]][:limit]
+        with stage('buscar', 'formato'):
+            results = self.movies_df.iloc[[position for position, _ in matches]][['title', 'release_year', 'id']].copy()
+            results['score'] = [round(score, 4) for _, score in matches]
+        return {"query": q, "results": results.to_dict(orient="records")}
+
     def score_titulo(self, titulo: str):
-        movie = self.movies_df[self.movies_df['title'].str.lower() == titulo.lower()]
-        if movie.empty:
+        with stage('score_titulo', 'titulo'):
+            movie_index = self._find_movie(titulo)
+        if movie_index is None:
             return {"error": "Película no encontrada"}
-        title = movie.iloc[0]['title']
-        year = movie.iloc[0]['release_year']
-        score = movie.iloc[0]['popularity']
+        movie = self.movies_df.iloc[movie_index]
+        title = movie['title']
+        year = movie['release_year']
+        score = exact_floats(self.movies_df['popularity'].iloc[[movie_index]])[0]
         return {"message": f"La película {title} fue estrenada en el año {year} con un score/popularidad de {score}"}
     
     def votos_titulo(self, titulo: str):
-        movie = self.movies_df[self.movies_df['title'].str.lower() == titulo.lower()]
-        if movie.empty:
+        with stage('votos_titulo', 'titulo'):
+            movie_index = self._find_movie(titulo)
+        if movie_index is None:
             return {"error": "Película no encontrada"}
-        vote_count = movie.iloc[0]['vote_count']
+        movie = self.movies_df.iloc[movie_index]
+        vote_count = movie['vote_count']
         if vote_count < 2000:
             return {"message": "La película no cumple con el mínimo de 2000 valoraciones"}
-        vote_average = movie.iloc[0]['vote_average']
-        title = movie.iloc[0]['title']
-        year = movie.iloc[0]['release_year']
+        vote_average = exact_floats(self.movies_df['vote_average'].iloc[[movie_index]])[0]
+        title = movie['title']
+        year = movie['release_year']
         return {"message": f"La película {title} fue estrenada en el año {year}. La misma cuenta con un total de {vote_count} valoraciones, con un promedio de {vote_average}"}
 
     def get_actor(self, nombre_actor: str):
-        actor_movies = self.movies_df[self.movies_df['cast'].str.contains(nombre_actor, case=False, na=False)]
-        if actor_movies.empty:
+        if self.actor_index is None:
+            return {"error": "El índice de actores todavía se está cargando"}
+        # Buscamos al actor en el índice invertido (exacto y, si no, por prefijo)
+        with stage('get_actor', 'indice'):
+            match = self.actor_index.lookup(nombre_actor)
+        if match is None:
             return {"error": "Actor no encontrado"}
-        actor_names = actor_movies['cast'].apply(
-            lambda x: next((name for name in x.split(',') if nombre_actor.lower() in name.lower()), nombre_actor)
-        ).unique()
-        
-        # Convertimos el nombre exacto a una cadena, seleccionando el primer valor
-        exact_actor_name = str(actor_names[0]) if actor_names.size > 0 else nombre_actor
-        exact_actor_name = exact_actor_name.strip("'[]'")
-        total_return = round(actor_movies['return'].sum(), 3)
-        movie_count = actor_movies.shape[0]
-        average_return = round(total_return / movie_count if movie_count > 0 else 0, 3)
+        exact_actor_name, positions = match
+        with stage('get_actor', 'agregacion'):
+            actor_movies = self.movies_df.iloc[positions]
+            total_return = round(exact_floats(actor_movies['return']).sum(), 3)
+            movie_count = actor_movies.shape[0]
+            average_return = round(total_return / movie_count if movie_count > 0 else 0, 3)
         return {"message": f"El actor {exact_actor_name} ha participado de {movie_count} cantidad de filmaciones, el mismo ha conseguido un retorno de {total_return} con un promedio de {average_return} por filmación"}
     
     def get_director(self, nombre_director: str):
-        # Filtramos las películas del director (sin distinguir mayúsculas y minúsculas)
-        director_movies = self.movies_df[self.movies_df['crew'].str.contains(nombre_director, case=False, na=False)]
-        
+        if self.director_index is None:
+            return {"error": "El índice de directores todavía se está cargando"}
+        # Buscamos al director en el índice invertido (exacto y, si no, por prefijo)
+        with stage('get_director', 'indice'):
+            match = self.director_index.lookup(nombre_director)
+
         # Si no hay películas encontradas, retornamos un error
-        if director_movies.empty:
+        if match is None:
             return {"error": "Director no encontrado"}
-        
-        # Obtenemos el nombre exacto del director tal como está en el DataFrame
-        director_names = director_movies['crew'].apply(
-            lambda x: next((name for name in x.split(',') if nombre_director.lower() in name.lower()), nombre_director)
-        ).unique()
-        
-        # Convertimos el nombre exacto a una cadena, seleccionando el primer valor
-        exact_director_name = str(director_names[0]) if director_names.size > 0 else nombre_director
-        exact_director_name = exact_director_name.strip("'[]'")
-        # Recopilamos la información de las películas dirigidas por el director
-        director_info = []
-        for _, movie in director_movies.iterrows():
-            title = movie['title']
-            release_date = movie['release_date']
+
+        # Nombre exacto del director tal como está en el dataset y sus películas
+        exact_director_name, positions = match
+        with stage('get_director', 'agregacion'):
+            director_movies = self.movies_df.iloc[positions]
+            # Recopilamos la información de las películas dirigidas por el director
+            director_info = []
+            amounts = zip(*(exact_floats(director_movies[column]) for column in ('return', 'budget', 'revenue')))
+            for (_, movie), (individual_return, budget, revenue) in zip(director_movies.iterrows(), amounts):
+                title = movie['title']
+                release_date = movie['release_date']
             
-            # Convertimos la fecha a formato 'YYYY-MM-DD'
-            formatted_date = str(release_date)
-
-            individual_return = movie['return']
-            budget = movie['budget']
-            revenue = movie['revenue']
-            director_info.append({
-                "title": title,
-                "release_date": formatted_date[:10],
-                "individual_return": individual_return,
-                "budget": budget,
-                "revenue": revenue
-                })
+                # Convertimos la fecha a formato 'YYYY-MM-DD'
+                formatted_date = str(release_date)
+                director_info.append({
+                    "title": title,
+                    "release_date": formatted_date[:10],
+                    "individual_return": individual_return,
+                    "budget": budget,
+                    "revenue": revenue
+                    })
         
         # Devolvemos el mensaje con el nombre exacto sin lista ni corchetes
         return {"message": f"El director {exact_director_name} ha dirigido las siguientes películas:", "movies": director_info}
 
-    def recomendacion(self, titulo, n_recommendations=5):
+    def _collection_members(self, movie_index: int) -> np.ndarray:
+        # Posiciones de las demás películas de la misma colección, en el orden del dataset
+        code = self.collection_codes[movie_index]
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        members = self.collection_members[code]
+        return members[members != movie_index]
+
+    def _genre_fallback_positions(self, movie_index: int, n_recommendations: int) -> np.ndarray:
+        # Si el índice está fuera de rango, usar similitud de géneros (Jaccard sobre la matriz de bits,
+        # desempatando por popularidad y cantidad de votos)
+        return self.genre_bitset.similar(movie_index, n_recommendations)
+
+    @property
+    def max_recommendations(self):
         """
-        Devuelve recomendaciones de películas basadas en similitud y/o colección.
-        Además, para cada recomendación, se llama a la API de OMDb usando el imdb_id
-        para obtener el póster de la película.
+        Máximo de recomendaciones por película: solo los K vecinos almacenados (o los
+        k del índice ANN) son candidatos, así que con un n mayor la lista se recortaría.
+        None mientras el índice no está cargado (el respaldo por géneros no tiene tope).
         """
-        # Convertir el título ingresado a minúsculas
-        title_lower = titulo.lower()
+        if self.ann is not None:
+            return self.ann.k
+        return self.neighbors.k if self.neighbors is not None else None
 
-        # Verificar si el título existe en la base de datos, ignorando mayúsculas/minúsculas
-        if title_lower not in self.movies_df['title'].str.lower().values:
-            return {"error": "El título no se encuentra en la base de datos."}
+    def _neighbors_len(self) -> int:
+        # Películas cubiertas por el motor de vecinos activo
+        if self.ann is not None:
+            return len(self.ann)
+        return len(self.neighbors) if self.neighbors is not None else 0
 
-        # Obtener el índice de la película y el título original para mantener el formato correcto
-        movie = self.movies_df[self.movies_df['title'].str.lower() == title_lower]
-        titulo = movie.iloc[0]['title']
-        movie_index = movie.index[0]
-        movie_genres = movie.iloc[0]['genres']  # Obtener los géneros de la película dada
-
-        # Verificar si el índice está dentro de los límites de la matriz de similitud
-        if movie_index >= len(self.weighted_similarity):
-            # Si el índice está fuera de rango, usar similitud de géneros
-            similar_movies = self.movies_df[self.movies_df['genres'].apply(
-                lambda x: any(genre in x for genre in movie_genres)
-            )]
-            # Excluir la película original
-            similar_movies = similar_movies[similar_movies.index != movie_index]
-            # Ordenar y tomar las top-n recomendaciones
-            similar_movies = similar_movies.sort_values(by=['popularity', 'vote_count'], ascending=False).head(n_recommendations)
-
-            # Convertir a un DataFrame para manipular y extraer pósters
-            final_recommendations = similar_movies
+    def _boosted_scores(self, candidates: np.ndarray, scores: np.ndarray,
+                        vote_weight: float = 0.0, popularity_weight: float = 0.0) -> np.ndarray:
+        """
+        Score final de cada candidato: similitud de contenido/géneros almacenada
+        + vote_weight * voto + popularity_weight * popularidad del candidato.
+        """
+        scores = scores.astype(np.float32)
+        if vote_weight:
+            scores = scores + vote_weight * self.vote_boost[candidates]
+        if popularity_weight:
+            scores = scores + popularity_weight * self.popularity_boost[candidates]
+        return scores
+
+    def _recommend_positions(self, movie_index: int, n_recommendations: int,
+                             vote_weight: float = 0.0, popularity_weight: float = 0.0) -> np.ndarray:
+        """
+        Posiciones de las películas recomendadas: primero las de la misma colección
+        y luego los vecinos con mayor score (ver _boosted_scores), excluyendo la propia película.
+        Los candidatos son los K vecinos almacenados: para n > `max_recommendations`
+        la lista puede quedar más corta que n (la API rechaza esos n con 422).
+        """
+        # Verificar si el índice está dentro de los límites del índice de vecinos
+        if movie_index >= self._neighbors_len():
+            return self._genre_fallback_positions(movie_index, n_recommendations)
+
+        # Películas de la misma colección (excepto la original)
+        collection = self._collection_members(movie_index)
+
+        # Si la colección tiene suficientes películas, retornarlas
+        if len(collection) >= n_recommendations:
+            return collection[:n_recommendations]
+
+        if self.ann is not None:
+            # Vecinos aproximados (se piden de más para cubrir los que descarta la colección;
+            # con boosts, los `k` del índice ANN para que puedan reordenarse)
+            k = n_recommendations if not (vote_weight or popularity_weight) else max(n_recommendations, self.ann.k)
+            neighbor_indices, neighbor_scores = self.ann.query_movie(movie_index, k + len(collection))
         else:
-            # Verificar si la película pertenece a una colección
-            collection_name = self.movies_df.loc[movie_index, 'belongs_to_collection']
-            collection_movies = pd.DataFrame()
-
-            if pd.notna(collection_name):
-                # Obtener todas las películas de esa colección (excepto la original)
-                collection_movies = self.movies_df[self.movies_df['belongs_to_collection'] == collection_name]
-                collection_movies = collection_movies[collection_movies.index != movie_index]
-
-            # Si la colección tiene suficientes películas, retornarlas
-            if len(collection_movies) >= n_recommendations:
-                final_recommendations = collection_movies.head(n_recommendations)
-            else:
-                # Calcular similitudes
-                similarity_scores = list(enumerate(self.weighted_similarity[movie_index]))
-                similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+            # Vecinos precalculados de la película
+            neighbor_indices, neighbor_scores = self.neighbors.row(movie_index)
+
+        # Máscara vectorizada: descartar la propia película y las de su colección
+        exclude = (neighbor_indices == movie_index) | np.isin(neighbor_indices, collection)
+        scores = self._boosted_scores(neighbor_indices, neighbor_scores, vote_weight, popularity_weight)
+        top = top_n(scores, n_recommendations - len(collection), exclude)
+
+        # Concatenar colección + recomendaciones extra
+        return np.concatenate([collection, neighbor_indices[top]])[:n_recommendations]
 
-                # Índices recomendados que no estén en la misma colección
-                recommended_indices = [
-                    i[0] for i in similarity_scores[1:] 
-                    if i[0] not in collection_movies.index
-                ][:n_recommendations - len(collection_movies)]
+    def _recommend_positions_batch(self, positions: np.ndarray, n_recommendations: int,
+                                   vote_weight: float = 0.0, popularity_weight: float = 0.0) -> dict:
+        """
+        Calcula las recomendaciones de muchas películas en una sola pasada vectorizada
+        sobre el índice de vecinos. Devuelve {posición: posiciones recomendadas}.
+        Mismo tope que `_recommend_positions`: como mucho K vecinos más la colección.
+        """
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        if self.ann is not None:
+            # En modo ANN cada consulta recorre sus propias cubetas; no hay matriz B × K que vectorizar
+            return {int(movie_index): self._recommend_positions(movie_index, n_recommendations, vote_weight, popularity_weight)
+                    for movie_index in positions}
+        in_matrix = positions < self._neighbors_len()
+        results = {}
+
+        # Películas fuera del índice de vecinos: respaldo por géneros
+        for movie_index in positions[~in_matrix]:
+            results[int(movie_index)] = self._genre_fallback_positions(movie_index, n_recommendations)
 
-                # Películas adicionales
-                additional_recommendations = self.movies_df.iloc[recommended_indices]
+        rows = positions[in_matrix]
+        if rows.size == 0:
+            return results
 
-                # Concatenar colección + recomendaciones extra
-                final_recommendations = pd.concat([collection_movies, additional_recommendations]).head(n_recommendations)
+        candidates = self.neighbors.indices[rows]
+        row_codes = self.collection_codes[rows][:, None]
+        # Excluir la propia película y las de su misma colección en toda la matriz B × K
+        exclude = (candidates == rows[:, None]) | ((self.collection_codes[candidates] == row_codes) & (row_codes >= 0))
+        scores = self._boosted_scores(candidates, self.neighbors.scores[rows], vote_weight, popularity_weight)
+        selected, valid = top_n_rows(scores, n_recommendations, exclude)
+        selected = np.take_along_axis(candidates, selected, axis=1)
 
+        for movie_index, row_selected, row_valid in zip(rows, selected, valid):
+            collection = self._collection_members(movie_index)
+            if len(collection) >= n_recommendations:
+                results[int(movie_index)] = collection[:n_recommendations]
+            else:
+                extra = row_selected[row_valid][:n_recommendations - len(collection)]
+                results[int(movie_index)] = np.concatenate([collection, extra])
+        return results
+
+    def _format_recommendations(self, positions, posters: bool = True, method: str = 'recomendacion') -> list:
         # Aquí solicitamos también la columna 'imdb_id', asumimos que existe en el CSV
         # (si no está, agrégala en tu test.csv).
         # Creamos un DataFrame temporal para manipular las recomendaciones.
-        recommended_movies = final_recommendations[['title', 'genres', 'vote_average', 'popularity', 'imdb_id', 'overview']].copy()
+        if posters:
+            # Resolvemos los pósters de todas las recomendaciones a la vez (caché + consultas concurrentes a OMDb)
+            with stage(method, 'posters'):
+                poster_urls = self.posters.resolve_many(self.movies_df['imdb_id'].iloc[positions].tolist())
+
+        with stage(method, 'formato'):
+            recommended_movies = self.movies_df.iloc[positions][['title', 'genres', 'vote_average', 'popularity', 'imdb_id']].copy()
+            recommended_movies['genres'] = [genre_list(genres) for genres in recommended_movies['genres']]
+            for column in ('vote_average', 'popularity'):
+                recommended_movies[column] = exact_floats(recommended_movies[column])
+            recommended_movies['overview'] = self.overviews.take(positions)
+            if posters:
+                recommended_movies['poster'] = poster_urls
+            return recommended_movies.to_dict(orient="records")
+
+    def recomendacion(self, titulo, n_recommendations=5, vote_weight=0.0, popularity_weight=0.0, posters=True):
+        """
+        Devuelve recomendaciones de películas basadas en similitud y/o colección.
+        `vote_weight` y `popularity_weight` ponderan en esta consulta el voto y la
+        popularidad de cada candidato (normalizados a [0, 1]) sobre la similitud.
+        Con `posters=False` no se consultan los pósters (la API los resuelve aparte).
+        Además, para cada recomendación, se llama a la API de OMDb usando el imdb_id
+        para obtener el póster de la película.
+        """
+        # Verificar si el título existe en la base de datos (búsqueda O(1) en el índice de títulos)
+        with stage('recomendacion', 'titulo'):
+            movie_index = self._find_movie(titulo)
+        if movie_index is None:
+            return {"error": "El título no se encuentra en la base de datos."}
 
-        # Para cada película recomendada, llamamos a la API de OMDb para obtener el póster
-        for idx, row in recommended_movies.iterrows():
-            imdb_id = row['imdb_id']
-            poster_url = self._get_poster_from_omdb(imdb_id)
-            recommended_movies.at[idx, 'poster'] = poster_url
+        positions = None
+        if self.materialized is not None and not (vote_weight or popularity_weight):
+            # Respuesta precalculada: una búsqueda por clave primaria en el almacén materializado
+            with stage('recomendacion', 'materializada'):
+                ids = self.materialized.get(self.movies_df['id'].iat[movie_index], n_recommendations)
+                if ids is not None:
+                    positions = [self.id_index[str(movie_id)] for movie_id in ids.tolist()]
+        if positions is None:
+            with stage('recomendacion', 'ranking'):
+                positions = self._recommend_positions(movie_index, n_recommendations, vote_weight, popularity_weight)
 
         # Retornamos la información en formato de lista de diccionarios
         return {
-            "recommendations": recommended_movies.to_dict(orient="records")
+            "recommendations": self._format_recommendations(positions, posters)
         }
 
-    def _get_poster_from_omdb(self, imdb_id: str) -> str:
+    def recomendacion_descripcion(self, descripcion: str, n_recommendations=5, posters=True):
         """
-        Función auxiliar para obtener el póster de la película a partir del imdb_id,
-        usando la API de OMDb.
+        Películas cuyo contenido (géneros, sinopsis, reparto y dirección) más se parece
+        a una descripción libre, p. ej. "heist in space with a robot". La descripción se
+        vectoriza con el TF-IDF ajustado y se compara con todo el catálogo en un solo
+        producto matriz dispersa × vector; cada recomendación incluye su 'score'.
         """
-        if pd.notna(imdb_id) and imdb_id != '':
-            api_key = open("key.txt", 'r').read()  # Reemplázalo con tu propia API Key
-            url = f"https://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
-            
-            try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    data = response.json()
-                    # 'Poster' podría no existir si la API no encuentra el póster
-                    return data.get('Poster', 'Póster no disponible')
-            except Exception as e:
-                print(f"Error al consultar OMDb: {e}")
-        
-        # Si no hay imdb_id o la consulta falla, devolvemos un valor por defecto
-        return "Póster no disponible"
\ No newline at end of file
+        if self.descriptions is None:
+            return {"error": "El índice de descripciones no está disponible."}
+        with stage('recomendacion_descripcion', 'ranking'):
+            positions, scores = self.descriptions.query(descripcion, n_recommendations)
+        if positions.size == 0:
+            return {"error": "Ninguna película coincide con la descripción."}
+        recommendations = self._format_recommendations(positions, posters, 'recomendacion_descripcion')
+        for recommendation, score in zip(recommendations, scores):
+            recommendation['score'] = round(float(score), 4)
+        return {"recommendations": recommendations}
+
+    def recomendacion_batch(self, titulos=(), ids=(), n_recommendations=5, posters=False, chunk_size=256,
+                            vote_weight=0.0, popularity_weight=0.0):
+        """
+        Recomendaciones para muchos títulos y/o ids de película. Procesa las consultas
+        por bloques de `chunk_size` (una pasada vectorizada por bloque) y devuelve un
+        generador con un resultado por consulta, para que la memoria se mantenga
+        constante aunque el lote sea grande.
+        """
+        queries = itertools.chain(
+            (("titulo", titulo, self._find_movie(titulo)) for titulo in titulos),
+            (("id", movie_id, self.id_index.get(str(movie_id))) for movie_id in ids),
+        )
+        while True:
+            chunk = list(itertools.islice(queries, chunk_size))
+            if not chunk:
+                break
+            found = [movie_index for _, _, movie_index in chunk if movie_index is not None]
+            with stage('recomendacion_batch', 'ranking'):
+                batch = self._recommend_positions_batch(found, n_recommendations, vote_weight, popularity_weight)
+
+            # Un solo acceso al DataFrame (y una sola resolución de pósters) por bloque
+            lists = [batch[movie_index] for movie_index in found]
+            records = self._format_recommendations(np.concatenate(lists), posters, 'recomendacion_batch') if lists else []
+            offsets = np.cumsum([0] + [len(positions) for positions in lists])
+
+            found_number = 0
+            for key, value, movie_index in chunk:
+                if movie_index is None:
+                    error = "El título no se encuentra en la base de datos." if key == "titulo" else "El id no se encuentra en la base de datos."
+                    yield {key: value, "error": error}
+                else:
+                    start, stop = offsets[found_number], offsets[found_number + 1]
+                    found_number += 1
+                    yield {key: value, "recommendations": records[start:stop]}
@@ -0,0 +1,279 @@
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# Formato binario del índice de vecinos (ver save_neighbor_index)
+_MAGIC = b'MOVNEIGH'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIQIIQQQ')
+_ALIGNMENT = 64
+
+
+class NeighborIndex:
+    """
+    Índice compacto con los top-K vecinos de cada película.
+    La fila i contiene las posiciones (en movies_df) de los K vecinos más similares
+    a la película i, ordenados de mayor a menor similitud, junto con su score.
+    """
+
+    def __init__(self, indices: np.ndarray, scores: np.ndarray, ids: np.ndarray = None):
+        self.indices = indices
+        self.scores = scores
+        self.ids = ids
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def row(self, movie_index: int):
+        return self.indices[movie_index], self.scores[movie_index]
+
+
+def _as_text(column):
+    # Las columnas desanidadas pueden venir como listas (Parquet) o como texto (CSV)
+    return column.map(lambda value: ' '.join(value) if isinstance(value, list) else value).fillna('')
+
+
+def build_content(movies_df):
+    # Columna combinada de 'genres', 'overview', 'cast' y 'crew' para similitud de contenido
+    return (
+        _as_text(movies_df['genres']) + " " +
+        movies_df['overview'].fillna('') + " " +
+        _as_text(movies_df['cast']) + " " +
+        _as_text(movies_df['crew'])
+    )
+
+
+def content_vectorizer() -> TfidfVectorizer:
+    # Vectorizador (sin ajustar) del contenido combinado y de los géneros
+    return TfidfVectorizer(stop_words='english')
+
+
+def build_tfidf_matrices(movies_df, return_vectorizers: bool = False):
+    """
+    Vectoriza el contenido combinado y los géneros con TF-IDF.
+    Devuelve ambas matrices dispersas normalizadas (L2), de modo que el producto
+    punto entre filas es directamente la similitud de coseno. Con
+    `return_vectorizers=True` devuelve además los dos vectorizadores ajustados.
+    """
+    tfidf = content_vectorizer()
+    tfidf_matrix = tfidf.fit_transform(build_content(movies_df))
+
+    tfidf_genres = content_vectorizer()
+    genres_matrix = tfidf_genres.fit_transform(_as_text(movies_df['genres']))
+
+    matrices = normalize(tfidf_matrix).tocsr(), normalize(genres_matrix).tocsr()
+    return (*matrices, (tfidf, tfidf_genres)) if return_vectorizers else matrices
+
+
+def _select_top_k(block: np.ndarray, candidates: np.ndarray, k: int):
+    """
+    Elige por filas los k mayores scores de `block` (B × C) y devuelve las
+    posiciones de película correspondientes (`candidates`, C o B × C) y sus scores,
+    en orden descendente y desempatando por posición como el sort estable original.
+    """
+    positions = np.broadcast_to(candidates, block.shape)
+    if k < block.shape[1]:
+        # Umbral = k-ésimo mayor score de cada fila; todo lo que lo supera entra seguro
+        threshold = -np.partition(-block, k - 1, axis=1)[:, k - 1:k]
+        above = block > threshold
+        missing = k - above.sum(axis=1, keepdims=True)
+        # argpartition no garantiza qué empates del umbral elige: se completan con
+        # las posiciones más bajas entre las empatadas (como mucho k por fila)
+        tie_key = np.where(block == threshold, positions, np.iinfo(np.int64).max)
+        tie_top = np.argpartition(tie_key, k - 1, axis=1)[:, :k]
+        tie_top = np.take_along_axis(tie_top, np.argsort(np.take_along_axis(tie_key, tie_top, axis=1), axis=1), axis=1)
+        chosen = above.copy()
+        tie_rows = np.broadcast_to(np.arange(block.shape[0])[:, None], tie_top.shape)
+        tie_take = np.arange(k) < missing
+        chosen[tie_rows[tie_take], tie_top[tie_take]] = True
+        # Exactamente k columnas por fila: nonzero en orden de filas se puede remodelar
+        top = np.flatnonzero(chosen).reshape(block.shape[0], k) % block.shape[1]
+    else:
+        top = np.broadcast_to(np.arange(block.shape[1]), block.shape)
+    top_scores = np.take_along_axis(block, top, axis=1)
+    top_positions = np.take_along_axis(positions, top, axis=1)
+    order = np.lexsort((top_positions, -top_scores), axis=1)
+    return np.take_along_axis(top_positions, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _compute_rows(tfidf_matrix, genres_matrix, rows: np.ndarray, k: int, block_size: int, genre_weight: float):
+    # Top-K exacto de las filas indicadas contra todo el catálogo, por bloques de filas
+    n_movies = tfidf_matrix.shape[0]
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float16)
+    if k == 0:
+        return indices, scores
+
+    tfidf_t = tfidf_matrix.T.tocsc()
+    genres_t = genres_matrix.T.tocsc()
+    all_positions = np.arange(n_movies)
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        # Bloque denso de (block_size × N): memoria acotada por block_size
+        block = (tfidf_matrix[block_rows] @ tfidf_t).toarray()
+        block += genre_weight * (genres_matrix[block_rows] @ genres_t).toarray()
+        # Excluir la propia película
+        block[np.arange(len(block_rows)), block_rows] = -np.inf
+
+        top_positions, top_scores = _select_top_k(block, all_positions, k)
+        indices[start:start + len(block_rows)] = top_positions
+        scores[start:start + len(block_rows)] = top_scores
+    return indices, scores
+
+
+def build_neighbor_index(tfidf_matrix, genres_matrix, k: int = 50, block_size: int = 1024,
+                         genre_weight: float = 0.25, ids=None) -> NeighborIndex:
+    """
+    Calcula los top-K vecinos de cada película por bloques de filas, sin
+    materializar nunca la matriz N×N completa. El score es el mismo que ordenaba
+    la antigua matriz ponderada: contenido + genre_weight * géneros (los términos
+    de 'vote_average' y 'popularity' eran constantes por fila y no alteran el orden).
+    """
+    n_movies = tfidf_matrix.shape[0]
+    k = max(0, min(k, n_movies - 1))
+    indices, scores = _compute_rows(tfidf_matrix, genres_matrix, np.arange(n_movies), k, block_size, genre_weight)
+
+    if ids is not None:
+        ids = np.asarray(ids, dtype=np.int64)
+    return NeighborIndex(indices, scores, ids)
+
+
+def update_neighbor_index(previous: NeighborIndex, tfidf_matrix, genres_matrix, ids, changed,
+                          block_size: int = 1024, genre_weight: float = 0.25) -> NeighborIndex:
+    """
+    Actualiza un índice de vecinos tras un refresco incremental del catálogo.
+    `ids` son los ids de película en el nuevo orden y `changed` una máscara con las
+    filas nuevas o modificadas. Las matrices TF-IDF deben venir del mismo vectorizador
+    que generó `previous`, de modo que los scores entre películas sin cambios siguen
+    siendo válidos.
+
+    - Se recalculan por completo las filas cambiadas y las filas sin cambios que
+      tenían como vecina a una película cambiada o eliminada.
+    - El resto conserva sus vecinos anteriores (reubicados a las nuevas posiciones)
+      fusionados con la similitud contra las películas cambiadas, que es exacta.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    changed = np.array(changed, dtype=bool)
+    n_movies = len(ids)
+    k = previous.k
+    if previous.ids is None or k > n_movies - 1:
+        return build_neighbor_index(tfidf_matrix, genres_matrix, k, block_size, genre_weight, ids)
+
+    # Posición nueva de cada fila del índice anterior (-1 si la película desapareció)
+    new_position = pd.Index(ids).get_indexer(np.asarray(previous.ids))
+    # Posición anterior de cada fila nueva (-1 si es nueva)
+    old_position = np.full(n_movies, -1, dtype=np.int64)
+    kept = new_position >= 0
+    old_position[new_position[kept]] = np.flatnonzero(kept)
+    changed |= old_position < 0
+
+    # Vecinos anteriores de las filas sin cambios, reubicados a posiciones nuevas
+    unchanged_rows = np.flatnonzero(~changed)
+    old_neighbors = new_position[np.asarray(previous.indices[old_position[unchanged_rows]])]
+    stale = (old_neighbors < 0) | changed[np.maximum(old_neighbors, 0)]
+    needs_recompute = stale.any(axis=1)
+
+    indices = np.empty((n_movies, k), dtype=np.int32)
+    scores = np.empty((n_movies, k), dtype=np.float16)
+
+    recompute_rows = np.concatenate([np.flatnonzero(changed), unchanged_rows[needs_recompute]])
+    indices[recompute_rows], scores[recompute_rows] = _compute_rows(
+        tfidf_matrix, genres_matrix, recompute_rows, k, block_size, genre_weight
+    )
+
+    merge_rows = unchanged_rows[~needs_recompute]
+    merge_neighbors = old_neighbors[~needs_recompute]
+    merge_scores = np.asarray(previous.scores[old_position[merge_rows]], dtype=np.float64)
+    changed_positions = np.flatnonzero(changed)
+    tfidf_changed_t = tfidf_matrix[changed_positions].T.tocsc()
+    genres_changed_t = genres_matrix[changed_positions].T.tocsc()
+
+    for start in range(0, len(merge_rows), block_size):
+        block_rows = merge_rows[start:start + block_size]
+        # Similitud exacta solo contra las películas cambiadas (B × C)
+        block = (tfidf_matrix[block_rows] @ tfidf_changed_t).toarray()
+        block += genre_weight * (genres_matrix[block_rows] @ genres_changed_t).toarray()
+
+        candidates = np.hstack([
+            merge_neighbors[start:start + block_size],
+            np.broadcast_to(changed_positions, block.shape),
+        ])
+        candidate_scores = np.hstack([merge_scores[start:start + block_size], block])
+        top_positions, top_scores = _select_top_k(candidate_scores, candidates, k)
+        indices[block_rows] = top_positions
+        scores[block_rows] = top_scores
+
+    return NeighborIndex(indices, scores, ids)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def save_neighbor_index(path: str, neighbor_index: NeighborIndex):
+    """
+    Escribe el índice en un formato binario crudo y versionado:
+    cabecera fija + bloques contiguos (little-endian, alineados a 64 bytes) de
+    posiciones int32 [N×K], scores float16 [N×K] e ids de película int64 [N].
+    Se escribe a un archivo temporal y se renombra, para que los lectores nunca
+    vean un archivo a medio escribir.
+    """
+    indices = np.ascontiguousarray(neighbor_index.indices, dtype='<i4')
+    scores = np.ascontiguousarray(neighbor_index.scores, dtype='<f2')
+    n_rows, k = indices.shape
+    has_ids = neighbor_index.ids is not None
+
+    indices_offset = _aligned(_HEADER.size)
+    scores_offset = _aligned(indices_offset + indices.nbytes)
+    ids_offset = _aligned(scores_offset + scores.nbytes)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, n_rows, k, int(has_ids),
+                             indices_offset, scores_offset, ids_offset))
+        f.seek(indices_offset)
+        f.write(indices.tobytes())
+        f.seek(scores_offset)
+        f.write(scores.tobytes())
+        if has_ids:
+            f.seek(ids_offset)
+            f.write(np.ascontiguousarray(neighbor_index.ids, dtype='<i8').tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_neighbor_index(path: str) -> NeighborIndex:
+    """
+    Abre el índice con numpy.memmap en modo solo lectura: no se copia nada a la
+    memoria privada del proceso, así que todos los workers de uvicorn comparten
+    las mismas páginas de la caché del sistema operativo.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} no es un índice de vecinos válido")
+    magic, version, n_rows, k, has_ids, indices_offset, scores_offset, ids_offset = _HEADER.unpack(header)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} no es un índice de vecinos válido")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versión de índice de vecinos no soportada: {version} (se esperaba {FORMAT_VERSION})")
+
+    if n_rows == 0 or k == 0:
+        # numpy.memmap no admite regiones vacías
+        indices = np.empty((n_rows, k), dtype='<i4')
+        scores = np.empty((n_rows, k), dtype='<f2')
+    else:
+        indices = np.memmap(path, dtype='<i4', mode='r', offset=indices_offset, shape=(n_rows, k))
+        scores = np.memmap(path, dtype='<f2', mode='r', offset=scores_offset, shape=(n_rows, k))
+    ids = None
+    if has_ids and n_rows > 0:
+        ids = np.memmap(path, dtype='<i8', mode='r', offset=ids_offset, shape=(n_rows,))
+    return NeighborIndex(indices, scores, ids)
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OMDB_URL = "https://www.omdbapi.com/"
+POSTER_NO_DISPONIBLE = "Póster no disponible"
+# Errores de OMDb que sí describen a la película (no existe o el id es inválido): se cachean como negativos
+OMDB_NOT_FOUND_ERRORS = {"Movie not found!", "Incorrect IMDb ID."}
+
+
+class OmdbError(Exception):
+    """OMDb rechazó la consulta (límite de consultas, API key inválida, ...); no dice nada de la película."""
+
+
+class PosterBackend(ABC):
+    """
+    Origen de pósters intercambiable. `fetch` devuelve la URL del póster o None si
+    la película no tiene póster, y lanza una excepción ante errores de red o del
+    servicio (que no se cachean).
+    """
+
+    @abstractmethod
+    def fetch(self, imdb_id: str):
+        ...
+
+
+class OmdbBackend(PosterBackend):
+    """
+    Backend de la API de OMDb con una sesión HTTP compartida (pool de conexiones)
+    y timeout por llamada. `base_url` permite apuntarlo a un servidor local de pruebas.
+    """
+
+    def __init__(self, api_key: str, base_url: str = OMDB_URL, timeout: float = 3.0, pool_size: int = 16):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, imdb_id: str):
+        response = self.session.get(self.base_url, params={"i": imdb_id, "apikey": self.api_key}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('Response') == 'False':
+            error = data.get('Error', '')
+            # "Request limit reached!", "Invalid API key!", etc. no son un negativo de la película
+            if error not in OMDB_NOT_FOUND_ERRORS:
+                raise OmdbError(error or "Respuesta de OMDb sin datos")
+            return None
+        poster = data.get('Poster')
+        # OMDb responde 'N/A' cuando no tiene póster para la película
+        if not poster or poster == 'N/A':
+            return None
+        return poster
+
+
+class PosterCache:
+    """
+    Caché persistente imdb_id → URL del póster en SQLite, con TTL para los
+    aciertos y un TTL más corto para los negativos (películas sin póster).
+    """
+
+    def __init__(self, path: str = None, ttl: float = 7 * 24 * 3600, negative_ttl: float = 24 * 3600):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posters (imdb_id TEXT PRIMARY KEY, poster TEXT, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, imdb_ids) -> dict:
+        """Devuelve {imdb_id: url o None} solo para las entradas vigentes."""
+        imdb_ids = list(imdb_ids)
+        if not imdb_ids:
+            return {}
+        placeholders = ','.join('?' * len(imdb_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT imdb_id, poster, fetched_at FROM posters WHERE imdb_id IN ({placeholders})", imdb_ids
+            ).fetchall()
+        now = time.time()
+        return {
+            imdb_id: poster for imdb_id, poster, fetched_at in rows
+            if now - fetched_at < (self.ttl if poster is not None else self.negative_ttl)
+        }
+
+    def set(self, imdb_id: str, poster):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posters (imdb_id, poster, fetched_at) VALUES (?, ?, ?)",
+                (imdb_id, poster, time.time())
+            )
+            self._conn.commit()
+
+
+class PosterResolver:
+    """
+    Resuelve los pósters de varias películas a la vez: primero consulta la caché y
+    luego lanza en paralelo las consultas pendientes al backend, con un timeout
+    total por solicitud. Las películas sin póster devuelven POSTER_NO_DISPONIBLE.
+    """
+
+    def __init__(self, backend: PosterBackend = None, cache: PosterCache = None,
+                 max_workers: int = 8, timeout: float = 5.0):
+        self.backend = backend
+        self.cache = cache
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='posters')
+
+    def resolve_many(self, imdb_ids) -> list:
+        imdb_ids = list(imdb_ids)
+        valid_ids = [i for i in dict.fromkeys(imdb_ids) if isinstance(i, str) and i != '']
+
+        results = self.cache.get_many(valid_ids) if self.cache is not None else {}
+        missing = [i for i in valid_ids if i not in results]
+
+        if missing and self.backend is not None:
+            futures = {self._executor.submit(self.backend.fetch, imdb_id): imdb_id for imdb_id in missing}
+            done, not_done = wait(futures, timeout=self.timeout)
+            for future in done:
+                imdb_id = futures[future]
+                try:
+                    poster = future.result()
+                except Exception as e:
+                    # Los errores de red o de OMDb no se cachean para reintentar en la próxima solicitud
+                    print(f"Error al consultar OMDb: {e}")
+                    continue
+                results[imdb_id] = poster
+                if self.cache is not None:
+                    try:
+                        self.cache.set(imdb_id, poster)
+                    except sqlite3.OperationalError as e:
+                        # Caché bloqueada o de solo lectura: el póster se devuelve igual, sin persistirlo
+                        print(f"Error al guardar el póster en la caché: {e}")
+            for future in not_done:
+                future.cancel()
+
+        return [results.get(imdb_id) or POSTER_NO_DISPONIBLE for imdb_id in imdb_ids]
+
+    def resolve(self, imdb_id: str) -> str:
+        return self.resolve_many([imdb_id])[0]
+
+
+def load_api_key(key_path: str = "key.txt"):
+    # La API Key se toma de la variable de entorno OMDB_API_KEY o del archivo key.txt
+    api_key = os.environ.get("OMDB_API_KEY")
+    if api_key:
+        return api_key.strip()
+    if os.path.exists(key_path):
+        with open(key_path, 'r') as f:
+            return f.read().strip()
+    return None
+
+
+def default_poster_resolver(key_path: str = "key.txt", cache_path: str = "Datasets/posters_cache.sqlite") -> PosterResolver:
+    api_key = load_api_key(key_path)
+    if api_key is None:
+        print("Warning: No se encontró la API Key de OMDb; los pósters no estarán disponibles.")
+        backend = None
+    else:
+        backend = OmdbBackend(api_key)
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir and not os.path.isdir(cache_dir):
+        cache_path = None
+    return PosterResolver(backend, PosterCache(cache_path))
@@ -0,0 +1,84 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo para solicitudes lentas, sin dependencias externas.
+
+    Mientras haya al menos una solicitud perfilada en curso, un hilo toma cada
+    `interval` segundos la pila de todos los hilos del proceso (event loop y pools
+    de CPU/I/O) con `sys._current_frames`. Si una solicitud tarda más de
+    `threshold` segundos, las muestras tomadas durante ella se guardan en
+    `directory` en formato de pilas colapsadas ("a;b;c N"), que leen flamegraph.pl
+    y speedscope. Con varias solicitudes simultáneas las muestras incluyen el
+    trabajo de todas: es un perfil del proceso durante la solicitud lenta.
+    """
+
+    def __init__(self, threshold: float, directory: str, interval: float = 0.005, max_depth: int = 64):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self.max_depth = max_depth
+        self.dumps = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def _stack(self, frame) -> str:
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+    def _sample(self):
+        own = threading.get_ident()
+        while True:
+            stacks = [self._stack(frame) for ident, frame in sys._current_frames().items() if ident != own]
+            # Bajo el lock: una sesión que ya terminó no recibe más muestras
+            with self._lock:
+                if not self._sessions:
+                    self._sampler = None
+                    return
+                for samples in self._sessions.values():
+                    samples.update(stacks)
+            time.sleep(self.interval)
+
+    @contextmanager
+    def profile(self, name: str):
+        """Perfila el bloque y guarda sus muestras si dura más que el umbral."""
+        samples = Counter()
+        with self._lock:
+            self._sessions[id(samples)] = samples
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+                self._sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                del self._sessions[id(samples)]
+            if elapsed >= self.threshold and samples:
+                self._dump(name, elapsed, samples)
+
+    def _dump(self, name: str, elapsed: float, samples: Counter):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')[:80]
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms-{slug}.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.dumps += 1
+
+    def stats(self) -> dict:
+        return {"threshold": self.threshold, "directory": self.directory, "interval": self.interval,
+                "dumps": self.dumps}
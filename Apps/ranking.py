@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def top_n(scores, n: int, exclude=None) -> np.ndarray:
+    """
+    Devuelve las posiciones de los n mayores scores, ordenadas de mayor a menor
+    (desempatando por posición, igual que un sort estable).
+    Usa selección parcial (argpartition) en lugar de ordenar todo el vector, de modo
+    que el trabajo proporcional a N ocurre solo dentro de NumPy.
+    `exclude` es una máscara booleana opcional con las posiciones a descartar.
+    """
+    scores = np.asarray(scores)
+    if exclude is not None:
+        candidates = np.flatnonzero(~np.asarray(exclude, dtype=bool))
+        candidate_scores = scores[candidates]
+    else:
+        candidates = None
+        candidate_scores = scores
+
+    n = min(n, candidate_scores.shape[0])
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if n < candidate_scores.shape[0]:
+        # Umbral = n-ésimo mayor score; los empates en el umbral se resuelven por posición
+        threshold = -np.partition(-candidate_scores, n - 1)[n - 1]
+        above = np.flatnonzero(candidate_scores > threshold)
+        ties = np.flatnonzero(candidate_scores == threshold)[:n - above.size]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(candidate_scores.shape[0])
+    order = np.lexsort((selected, -candidate_scores[selected].astype(np.float64)))
+    selected = selected[order]
+
+    return candidates[selected] if candidates is not None else selected
+
+
+def top_n_rows(scores, n: int, exclude=None):
+    """
+    Versión por filas de `top_n` para una matriz de scores cortos (B × K, p. ej. las
+    filas del índice de vecinos): selecciona en una sola operación vectorizada las
+    n mejores columnas de cada fila.
+    Devuelve (columnas, válidas): las columnas elegidas ordenadas de mayor a menor
+    score (desempate por columna) y una máscara que indica cuáles no estaban excluidas.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if exclude is not None:
+        scores = np.where(exclude, -np.inf, scores)
+
+    n = max(0, min(n, scores.shape[1]))
+    # Con K pequeño, un argsort estable por filas es tan barato como la selección parcial
+    selected = np.argsort(-scores, axis=1, kind='stable')[:, :n]
+    valid = np.isfinite(np.take_along_axis(scores, selected, axis=1))
+    return selected, valid
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from Apps.cache import artifact_version
+
+
+class HotReloader:
+    """
+    Recarga en caliente de los artefactos de MovieSys (dataset, índice de vecinos, ...).
+
+    La nueva instancia se construye completa en segundo plano con `factory` (que
+    carga y valida los artefactos) mientras la actual sigue atendiendo; solo si la
+    carga termina bien se reemplaza la referencia y se notifica con `on_swap`. Las
+    solicitudes en curso terminan con la instancia anterior. Un error deja la
+    versión actual en servicio y queda registrado en `status`.
+    """
+
+    def __init__(self, factory, current, on_swap=None, paths=()):
+        self.factory = factory
+        self.current = current
+        self.on_swap = on_swap
+        self.paths = tuple(paths)
+        self.state = 'inactivo'
+        self.error = None
+        self.last_reload = None
+        self._failed_version = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def reload(self) -> bool:
+        """Recarga de forma sincrónica; devuelve False si ya había una recarga en curso."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        version = artifact_version(*self.paths)
+        try:
+            self.state = 'cargando'
+            self.error = None
+            candidate = self.factory()
+            self.current = candidate
+            if self.on_swap is not None:
+                self.on_swap(candidate)
+            self.state = 'inactivo'
+            self.last_reload = time.time()
+            self._failed_version = None
+            return True
+        except Exception as e:
+            self.state = 'error'
+            self.error = f"{type(e).__name__}: {e}"
+            self._failed_version = version
+            print(f"Error al recargar los artefactos: {self.error}")
+            return True
+        finally:
+            self._lock.release()
+
+    def reload_in_background(self) -> bool:
+        if self._lock.locked():
+            return False
+        threading.Thread(target=self.reload, name='moviesys-reload', daemon=True).start()
+        return True
+
+    def _changed(self) -> bool:
+        # Los artefactos en disco difieren de los cargados (y no son una versión que ya falló)
+        if not self.current.ready:
+            return False
+        version = artifact_version(*self.paths)
+        return version != self.current.version and version != self._failed_version
+
+    def watch(self, interval: float):
+        """
+        Revisa cada `interval` segundos el tamaño y la fecha de modificación de los
+        artefactos y recarga cuando cambian. Si un archivo se está escribiendo, la
+        carga falla y se reintenta al cambiar de nuevo.
+        """
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self._changed():
+                        self.reload()
+                except Exception as e:
+                    print(f"Error al revisar los artefactos: {e}")
+
+        self._watcher = threading.Thread(target=loop, name='moviesys-watch', daemon=True)
+        self._watcher.start()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "version": self.current.version,
+            "last_reload": self.last_reload,
+            "watching": self._watcher is not None,
+        }
@@ -1,10 +1,152 @@
 # streamlit_app.py
 
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
 import streamlit as st
 import requests
-import ast
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 st.set_page_config(page_title="Mi Sistema de Recomendación", layout="wide")
 
+# URL base de la API de FastAPI y cuánto tiempo (segundos) se reutiliza una respuesta ya consultada
+API_URL = os.environ.get("API_URL", "http://127.0.0.1:8000")
+API_CACHE_TTL = int(os.environ.get("API_CACHE_TTL", 300))
+TIMEOUT = (3.05, 30)  # conexión, lectura
+POSTER_WORKERS = 8
+POSTER_CACHE_SIZE = 512
+
+
+class ApiError(Exception):
+    pass
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    Sesión HTTP compartida por todas las ejecuciones y usuarios de la app: reutiliza
+    las conexiones keep-alive con la API y con los servidores de pósters en lugar de
+    abrir una conexión nueva por consulta, y reintenta los errores transitorios.
+    """
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POSTER_WORKERS * 2, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_poster_pool():
+    # Pool para descargar pósters en paralelo y caché LRU (URL → imagen como data URI) compartida
+    return ThreadPoolExecutor(max_workers=POSTER_WORKERS, thread_name_prefix="posters"), OrderedDict(), threading.Lock()
+
+
+@st.cache_data(ttl=API_CACHE_TTL, max_entries=1024, show_spinner=False)
+def api_get(path: str, params: tuple = ()):
+    """
+    GET a la API con la sesión compartida. Las respuestas correctas quedan en caché
+    por `API_CACHE_TTL` segundos: los reruns de Streamlit y las consultas repetidas
+    no vuelven a llegar al backend. Los errores (ApiError) no se guardan.
+    """
+    resp = get_session().get(f"{API_URL}{path}", params=dict(params), timeout=TIMEOUT)
+    if resp.status_code != 200:
+        raise ApiError(f"La API respondió {resp.status_code}")
+    return resp.json()
+
+
+@st.cache_data(ttl=API_CACHE_TTL, max_entries=1024, show_spinner=False)
+def api_recommendations_without_posters(titulo: str, n_recommendations: int):
+    # Recomendaciones sin esperar a OMDb (endpoint batch con posters=False, una línea NDJSON)
+    resp = get_session().post(f"{API_URL}/recomendacion/batch", timeout=TIMEOUT,
+                              json={"titulos": [titulo], "n_recommendations": n_recommendations, "posters": False})
+    if resp.status_code != 200:
+        raise ApiError(f"La API respondió {resp.status_code}")
+    return json.loads(resp.text.splitlines()[0])
+
+
+def consultar(path: str, **params):
+    """Resultado de la API (o None, mostrando el error en la página)."""
+    try:
+        return api_get(path, tuple(sorted(params.items())))
+    except Exception as e:
+        st.error(f"Error al consultar la API: {e}")
+        return None
+
+
+def segment(value: str) -> str:
+    # Texto libre como segmento de ruta ('/' o '?' en un título no rompen la URL)
+    return quote(value, safe="")
+
+
+def download_poster(session: requests.Session, url: str):
+    resp = session.get(url, timeout=TIMEOUT)
+    resp.raise_for_status()
+    content_type = resp.headers.get("Content-Type", "image/jpeg")
+    return f"data:{content_type};base64,{base64.b64encode(resp.content).decode()}"
+
+
+def load_posters(urls: list, on_ready):
+    """
+    Descarga en paralelo los pósters que no estén en caché y llama a
+    `on_ready(posición, imagen)` a medida que cada uno está disponible (también con
+    los que ya estaban en caché), para que las tarjetas se completen progresivamente.
+    """
+    pool, cache, lock = get_poster_pool()
+    # La sesión se obtiene aquí: los hilos del pool no tienen contexto de Streamlit
+    session = get_session()
+    pending = {}
+    for position, url in enumerate(urls):
+        if not url or not url.startswith("http"):
+            on_ready(position, None)
+            continue
+        with lock:
+            image = cache.get(url)
+            if image is not None:
+                cache.move_to_end(url)
+        if image is not None:
+            on_ready(position, image)
+        else:
+            pending[pool.submit(download_poster, session, url)] = (position, url)
+    for future in as_completed(pending):
+        position, url = pending[future]
+        try:
+            image = future.result()
+        except Exception:
+            # Si la descarga falla, el navegador intenta cargar la URL original
+            image = url
+        else:
+            with lock:
+                cache[url] = image
+                if len(cache) > POSTER_CACHE_SIZE:
+                    cache.popitem(last=False)
+        on_ready(position, image)
+
+
+def flip_card_html(poster, overview: str) -> str:
+    # Estructura HTML para flip-card ("" mientras se carga el póster, None si no hay)
+    if poster:
+        front = f'<img src="{poster}" alt="Poster">'
+    else:
+        front = "<p>Sin póster disponible</p>" if poster is None else "<p>Cargando póster…</p>"
+    return f"""
+    <div class="flip-card">
+        <div class="flip-card-inner">
+            <div class="flip-card-front">
+                {front}
+            </div>
+            <div class="flip-card-back">
+                <p>{overview}</p>
+            </div>
+        </div>
+    </div>
+    """
+
 def main():
     st.title("Sistema de Recomendación de Películas")
     st.write("Esta aplicación utiliza un backend (FastAPI) que expone varios endpoints para consultar información sobre películas.")
@@ -84,9 +226,6 @@ def main():
 
     st.markdown(flip_card_css, unsafe_allow_html=True)
 
-    # URL base de tu API local de FastAPI
-    API_URL = "http://127.0.0.1:8000"
-
     # Menú lateral con todas las opciones (endpoints)
     menu = [
         "Inicio (Root)",
@@ -107,15 +246,9 @@ def main():
         st.subheader("Bienvenida")
         st.write("Al hacer clic en 'Consultar', se mostrará el mensaje de bienvenida de la API.")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    st.json(data)
-                else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+            data = consultar("/")
+            if data is not None:
+                st.json(data)
 
     # --------------------------------------------
     # 3. Cantidad de filmaciones por mes (/cantidad_filmaciones_mes/{mes})
@@ -124,18 +257,12 @@ def main():
         st.subheader("Cantidad de filmaciones por mes")
         mes = st.text_input("Ingresa un mes (ejemplo: enero, febrero...)")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/cantidad_filmaciones_mes/{mes}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.success(data["message"])
+            data = consultar(f"/cantidad_filmaciones_mes/{segment(mes)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    st.success(data["message"])
 
     # ---------------------------------------------
     # 4. Cantidad de filmaciones por día (/cantidad_filmaciones_dia/{dia})
@@ -144,18 +271,12 @@ def main():
         st.subheader("Cantidad de filmaciones por día")
         dia = st.text_input("Ingresa un día (ejemplo: lunes, martes...)")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/cantidad_filmaciones_dia/{dia}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.success(data["message"])
+            data = consultar(f"/cantidad_filmaciones_dia/{segment(dia)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    st.success(data["message"])
 
     # -----------------------------
     # 5. Score título (/score_titulo/{titulo})
@@ -164,18 +285,12 @@ def main():
         st.subheader("Score título")
         titulo = st.text_input("Ingresa el título de la película:")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/score_titulo/{titulo}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.success(data["message"])
+            data = consultar(f"/score_titulo/{segment(titulo)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    st.success(data["message"])
 
     # ------------------------------
     # 6. Votos título (/votos_titulo/{titulo})
@@ -184,18 +299,12 @@ def main():
         st.subheader("Votos título")
         titulo = st.text_input("Ingresa el título de la película:")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/votos_titulo/{titulo}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.info(data["message"])
+            data = consultar(f"/votos_titulo/{segment(titulo)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    st.info(data["message"])
 
     # --------------------------------
     # 7. Get actor (/get_actor/{nombre_actor})
@@ -204,18 +313,12 @@ def main():
         st.subheader("Get actor")
         actor = st.text_input("Ingresa el nombre del actor o actriz:")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/get_actor/{actor}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.success(data["message"])
+            data = consultar(f"/get_actor/{segment(actor)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    st.success(data["message"])
 
     # ---------------------------------
     # 8. Get director (/get_director/{nombre_director})
@@ -224,27 +327,21 @@ def main():
         st.subheader("Get director")
         director = st.text_input("Ingresa el nombre del director:")
         if st.button("Consultar"):
-            try:
-                resp = requests.get(f"{API_URL}/get_director/{director}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        # Mostramos mensaje principal
-                        st.success(data["message"])
-                        # Mostramos la info de las películas dirigidas
-                        if "movies" in data:
-                            st.write("Películas dirigidas:")
-                            for m in data["movies"]:
-                                st.write(f"- **{m['title']}** (Fecha: {m['release_date']})")
-                                st.write(f"  - Return: {m['individual_return']}")
-                                st.write(f"  - Budget: {m['budget']}, Revenue: {m['revenue']}")
-                                st.write("---")
+            data = consultar(f"/get_director/{segment(director)}")
+            if data is not None:
+                if "error" in data:
+                    st.error(data["error"])
                 else:
-                    st.error("Error al consultar la API.")
-            except Exception as e:
-                st.error(f"Error: {e}")
+                    # Mostramos mensaje principal
+                    st.success(data["message"])
+                    # Mostramos la info de las películas dirigidas
+                    if "movies" in data:
+                        st.write("Películas dirigidas:")
+                        for m in data["movies"]:
+                            st.write(f"- **{m['title']}** (Fecha: {m['release_date']})")
+                            st.write(f"  - Return: {m['individual_return']}")
+                            st.write(f"  - Budget: {m['budget']}, Revenue: {m['revenue']}")
+                            st.write("---")
 
     # --------------------------------------------------
     # 9. Recomendación (/recomendacion/{titulo})
@@ -255,67 +352,59 @@ def main():
         titulo = st.text_input("Ingresa el título de la película:")
         n_recs = st.number_input("Cantidad de recomendaciones", min_value=1, max_value=10, value=5)
         if st.button("Consultar"):
+            # 1) Recomendaciones sin pósters: las tarjetas aparecen sin esperar a OMDb
             try:
-                url = f"{API_URL}/recomendacion/{titulo}?n_recommendations={n_recs}"
-                resp = requests.get(url)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if "error" in data:
-                        st.error(data["error"])
-                    else:
-                        st.success("Recomendaciones encontradas:")
-                        
-                        # data["recommendations"] es la lista de recomendaciones
-                        recommendations = data["recommendations"]
-                        n_cols = 4 # Máximo de columnas por fila
-
-                        # Mostramos cada recomendación con la animación de flip
-                    for i in range(0, len(recommendations), n_cols):
-                        row = recommendations[i : i + n_cols]
-                        # Creamos tantas columnas como recomendaciones haya en este bloque
-                        cols = st.columns(len(row))
-
-                        for j, rec in enumerate(row):
-                            with cols[j]:
-                                poster = rec.get("poster", "")
-                                overview = rec.get("overview", "Sin descripción.")
-                                title = rec.get("title", "Título no disponible")
-
-                                # Convertir géneros de string a lista, si hace falta
-                                import ast
-                                genres_str = rec.get("genres", "[]")
-                                try:
-                                    genres_list = ast.literal_eval(genres_str)
-                                except:
-                                    genres_list = []
-                                # Formatear géneros en backticks
-                                genres_md = ", ".join([f"`{g}`" for g in genres_list])
-
-                                # Estructura HTML para flip-card
-                                card_html = f"""
-                                <div class="flip-card">
-                                    <div class="flip-card-inner">
-                                        <div class="flip-card-front">
-                                            <img src="{poster}" alt="Poster">
-                                        </div>
-                                        <div class="flip-card-back">
-                                            <p>{overview}</p>
-                                        </div>
-                                    </div>
-                                </div>
-                                """
-
-                                st.markdown(f"**Recomendación {i + j + 1}:**")
-                                st.markdown(card_html, unsafe_allow_html=True)
-                                st.write(f"- **Título:** {title}")
-                                st.write(f"- **Géneros:** {genres_md}")
-                                st.write(f"- **Puntuación:** {rec.get('vote_average')}")
-                                st.write(f"- **Popularidad:** {rec.get('popularity')}")
-                                st.write("---")
-                else:
-                    st.error("Error al consultar la API.")
+                data = api_recommendations_without_posters(titulo, int(n_recs))
             except Exception as e:
-                st.error(f"Error: {e}")
+                st.error(f"Error al consultar la API: {e}")
+                return
+            if "error" in data:
+                st.error(data["error"])
+                return
+            st.success("Recomendaciones encontradas:")
+
+            # data["recommendations"] es la lista de recomendaciones
+            recommendations = data["recommendations"]
+            n_cols = 4 # Máximo de columnas por fila
+
+            # Mostramos cada recomendación con la animación de flip; la portada es un
+            # contenedor que se completa cuando llega su póster
+            cards = []
+            for i in range(0, len(recommendations), n_cols):
+                row = recommendations[i : i + n_cols]
+                # Creamos tantas columnas como recomendaciones haya en este bloque
+                cols = st.columns(len(row))
+
+                for j, rec in enumerate(row):
+                    with cols[j]:
+                        overview = rec.get("overview", "Sin descripción.")
+                        title = rec.get("title", "Título no disponible")
+                        # La API devuelve los géneros como lista
+                        genres_md = ", ".join([f"`{g}`" for g in rec.get("genres") or []])
+
+                        st.markdown(f"**Recomendación {i + j + 1}:**")
+                        card = st.empty()
+                        card.markdown(flip_card_html("", overview), unsafe_allow_html=True)
+                        cards.append((card, overview))
+                        st.write(f"- **Título:** {title}")
+                        st.write(f"- **Géneros:** {genres_md}")
+                        st.write(f"- **Puntuación:** {rec.get('vote_average')}")
+                        st.write(f"- **Popularidad:** {rec.get('popularity')}")
+                        st.write("---")
+
+            # 2) URLs de los pósters de exactamente esas películas (resueltas en la API, con su caché),
+            #    unidas por imdb_id, y descarga en paralelo
+            imdb_ids = [rec.get("imdb_id") or "" for rec in recommendations]
+            data = consultar("/posters", imdb_ids=",".join(i for i in imdb_ids if i))
+            if data is None:
+                return
+            posters = [data["posters"].get(imdb_id) or "" for imdb_id in imdb_ids]
+
+            def show_poster(position, image):
+                card, overview = cards[position]
+                card.markdown(flip_card_html(image, overview), unsafe_allow_html=True)
+
+            load_posters(posters, show_poster)
 
 
 if __name__ == "__main__":
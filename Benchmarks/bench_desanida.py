@@ -0,0 +1,56 @@
+"""
+Benchmark del desanidado del ETL: las funciones originales aplicadas columna a
+columna con .apply (como en Notebook/Modelo.ipynb) frente a desanidar_dataset
+(una pasada por fila con expresiones regulares), en serie y en un pool de procesos.
+
+Uso (desde la raíz del repositorio):
+    python -m Benchmarks.bench_desanida --n-movies 45000 --procesos 4
+"""
+import argparse
+import os
+import time
+
+from Benchmarks.synthetic import make_raw_movies
+from ETL_functs.desanida_ import desanida_column, extraer_directores, desanidar_dataset
+
+
+def desanidado_original(df):
+    df = df.copy()
+    for column in ['belongs_to_collection', 'genres', 'production_companies', 'production_countries', 'spoken_languages']:
+        df[column] = df[column].apply(lambda x: desanida_column('name', x))
+    df['cast'] = df['cast'].apply(lambda x: desanida_column('name', x, 5))
+    df['crew'] = df['crew'].apply(extraer_directores)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-movies', type=int, default=20000)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    raw = make_raw_movies(args.n_movies)
+    variants = [
+        ("original (.apply + literal_eval)", desanidado_original),
+        ("rápido (1 proceso)", lambda df: desanidar_dataset(df)),
+    ]
+    if args.procesos > 1:
+        variants.append((f"rápido ({args.procesos} procesos)", lambda df: desanidar_dataset(df, procesos=args.procesos)))
+    results = {}
+    for name, func in variants:
+        start = time.perf_counter()
+        results[name] = func(raw)
+        print(f"{name:<36} {time.perf_counter() - start:8.2f} s")
+    if args.procesos <= 1:
+        # Con un solo proceso el pool repetiría la línea en serie
+        reason = "1 CPU" if (os.cpu_count() or 1) == 1 else "--procesos 1"
+        print(f"{'rápido (pool de procesos)':<36} (omitido: {reason})")
+
+    # Todas las variantes deben producir exactamente el mismo resultado
+    expected = next(iter(results.values())).astype(str)
+    for name, df in results.items():
+        assert df.astype(str).equals(expected), name
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark de arranque: carga del dataset desde el CSV heredado frente al
+formato columnar Parquet generado por ETL_functs.dataset_io.
+
+Mide el tiempo de carga (hasta tener el esquema tipado que usa MovieSys) y la
+memoria del DataFrame resultante, sobre un catálogo sintético.
+
+Uso (desde la raíz del repositorio):
+    python -m Benchmarks.bench_startup --n-movies 45000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import cargar_dataset, guardar_columnar
+
+
+def measure(path, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        movies_df = cargar_dataset(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), movies_df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-movies', type=int, default=45000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.n_movies)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'test.csv')
+        parquet_path = os.path.join(tmp, 'movies.parquet')
+        catalog.to_csv(csv_path, index=False)
+        guardar_columnar(catalog, parquet_path)
+
+        for name, path in (("CSV", csv_path), ("Parquet", parquet_path)):
+            seconds, memory = measure(path, args.repeats)
+            print(f"{name:<8} archivo={os.path.getsize(path) / 1e6:7.1f} MB  "
+                  f"carga={seconds * 1000:8.1f} ms  memoria={memory / 1e6:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de la selección top-N de MovieSys.recomendacion.
+
+1. Micro-benchmark sobre una fila de similitud densa de N películas (la forma de
+   la antigua matriz N×N): compara el camino anterior (lista de tuplas ordenada en
+   Python y filtrado con una list comprehension) con la selección parcial
+   vectorizada de Apps.ranking.top_n. No es el camino que recorre hoy la API.
+2. El camino real: MovieSys._recommend_positions sobre la fila de K vecinos de
+   `neighbors.bin`, con un catálogo sintético de N películas (sin pósters).
+
+Uso (desde la raíz del repositorio):
+    python -m Benchmarks.bench_topn --n-movies 45000 --repeats 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Apps.models2 import MovieSys
+from Apps.neighbors import build_neighbor_index, build_tfidf_matrices, save_neighbor_index
+from Apps.posters import PosterResolver
+from Apps.ranking import top_n
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import guardar_columnar, tipar_dataset
+
+
+def legacy_selection(similarity_row, movie_index, collection_index, n_recommendations):
+    similarity_scores = list(enumerate(similarity_row))
+    similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+    return [
+        i[0] for i in similarity_scores[1:]
+        if i[0] not in collection_index
+    ][:n_recommendations]
+
+
+def vectorized_selection(similarity_row, movie_index, collection_index, n_recommendations):
+    exclude = np.zeros(similarity_row.shape[0], dtype=bool)
+    exclude[movie_index] = True
+    exclude[collection_index] = True
+    return top_n(similarity_row, n_recommendations, exclude)
+
+
+def measure(func, rows, *args):
+    latencies = []
+    for row, movie_index in rows:
+        start = time.perf_counter()
+        func(row, movie_index, *args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def measure_neighbors(args, positions):
+    """Latencia de MovieSys._recommend_positions sobre el índice de K vecinos real."""
+    with tempfile.TemporaryDirectory() as directory:
+        movies_path = os.path.join(directory, 'movies.parquet')
+        neighbors_path = os.path.join(directory, 'neighbors.bin')
+        catalog = make_catalog(args.n_movies, seed=args.seed)
+        guardar_columnar(catalog, movies_path)
+        movies_df = tipar_dataset(catalog)
+        save_neighbor_index(neighbors_path, build_neighbor_index(*build_tfidf_matrices(movies_df), k=args.k,
+                                                                 ids=movies_df['id']))
+        movie_sys = MovieSys(movies_path, neighbors_path, PosterResolver())
+
+        for name, weights in (("ponderaciones por defecto", (0.0, 0.0)), ("vote/popularity_weight=0.5", (0.5, 0.5))):
+            latencies = []
+            for movie_index in positions:
+                start = time.perf_counter()
+                movie_sys._recommend_positions(int(movie_index), args.n_recommendations, *weights)
+                latencies.append((time.perf_counter() - start) * 1000)
+            label = f"fila K={movie_sys.max_recommendations} ({name})"
+            print(f"{label:<40} p50={np.percentile(latencies, 50):8.3f} ms  p99={np.percentile(latencies, 99):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-movies', type=int, default=20000)
+    parser.add_argument('--n-recommendations', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--k', type=int, default=50, help="Vecinos por película del índice real")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    for _ in range(args.repeats):
+        movie_index = int(rng.integers(args.n_movies))
+        row = rng.random(args.n_movies).astype(np.float16)
+        row[movie_index] = 2  # la propia película siempre es la más similar
+        rows.append((row, movie_index))
+    collection_index = pd.Index(rng.choice(args.n_movies, 3, replace=False))
+
+    # Verificar que ambos caminos devuelven las mismas películas
+    row, movie_index = rows[0]
+    legacy = legacy_selection(row, movie_index, collection_index, args.n_recommendations)
+    vectorized = vectorized_selection(row, movie_index, collection_index.to_numpy(), args.n_recommendations)
+    assert set(legacy) == set(vectorized.tolist()), (legacy, vectorized)
+
+    print(f"Fila densa de {args.n_movies} películas (micro-benchmark)")
+    for name, func, collection in (
+        ("antes (sorted + list comprehension)", legacy_selection, collection_index),
+        ("después (argpartition + máscara)", vectorized_selection, collection_index.to_numpy()),
+    ):
+        p50, p99 = measure(func, rows, collection, args.n_recommendations)
+        print(f"{name:<40} p50={p50:8.3f} ms  p99={p99:8.3f} ms")
+
+    print(f"\nMovieSys._recommend_positions sobre neighbors.bin ({args.n_movies} películas)")
+    measure_neighbors(args, [movie_index for _, movie_index in rows])
+
+
+if __name__ == '__main__':
+    main()
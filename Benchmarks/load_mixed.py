@@ -0,0 +1,119 @@
+"""
+Prueba de carga de la API con tráfico mixto.
+
+Levanta Apps.main en proceso sobre un catálogo sintético (con un backend de
+pósters simulado que tarda `--poster-latency` segundos por consulta) y lanza
+`--clients` clientes concurrentes durante `--seconds` segundos. Cada cliente
+elige un endpoint según la mezcla: consultas livianas (score/votos), directores y
+recomendaciones. Informa throughput, p50/p99 por endpoint y respuestas 429.
+
+Uso (desde la raíz del repositorio):
+    python -m Benchmarks.load_mixed --n-movies 20000 --clients 64 --seconds 20
+"""
+import argparse
+import asyncio
+import collections
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from Apps.neighbors import build_tfidf_matrices, build_neighbor_index, save_neighbor_index
+from Apps.posters import PosterBackend, PosterCache, PosterResolver
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import guardar_columnar, tipar_dataset
+
+
+class SlowPosterBackend(PosterBackend):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def fetch(self, imdb_id: str):
+        time.sleep(self.latency)
+        return f"https://posters.example/{imdb_id}.jpg"
+
+
+def prepare(directory, n_movies, seed):
+    movies_df = make_catalog(n_movies, seed=seed)
+    os.makedirs(os.path.join(directory, 'Datasets'))
+    guardar_columnar(movies_df, os.path.join(directory, 'Datasets', 'movies.parquet'))
+    typed_df = tipar_dataset(movies_df)
+    tfidf_matrix, genres_matrix = build_tfidf_matrices(typed_df)
+    neighbor_index = build_neighbor_index(tfidf_matrix, genres_matrix, k=50, ids=typed_df['id'])
+    save_neighbor_index(os.path.join(directory, 'Datasets', 'neighbors.bin'), neighbor_index)
+    return typed_df
+
+
+async def client(http, movies_df, mix, deadline, latencies, statuses, rng):
+    titles = movies_df['title'].tolist()
+    directors = [crew[0] for crew in movies_df['crew'] if crew]
+    while time.perf_counter() < deadline:
+        kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+        if kind == 'liviano':
+            url = f"/{rng.choice(['score_titulo', 'votos_titulo'])}/{rng.choice(titles)}"
+        elif kind == 'director':
+            url = f"/get_director/{rng.choice(directors)}"
+        else:
+            url = f"/recomendacion/{rng.choice(titles)}"
+        start = time.perf_counter()
+        response = await http.get(url)
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+        if response.status_code == 429:
+            await asyncio.sleep(0.01)
+
+
+async def run(app, movies_df, args):
+    mix = {'liviano': args.mix[0], 'director': args.mix[1], 'recomendacion': args.mix[2]}
+    latencies = collections.defaultdict(list)
+    statuses = collections.Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as http:
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(
+            client(http, movies_df, mix, deadline, latencies, statuses, random.Random(args.seed + i))
+            for i in range(args.clients)
+        ))
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-movies', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--poster-latency', type=float, default=0.2)
+    parser.add_argument('--mix', type=float, nargs=3, default=[0.7, 0.1, 0.2],
+                        metavar=('LIVIANO', 'DIRECTOR', 'RECOMENDACION'))
+    parser.add_argument('--cache-size', type=int, default=0, help="0 desactiva la caché de respuestas")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        movies_df = prepare(directory, args.n_movies, args.seed)
+        os.environ["RESPONSE_CACHE_SIZE"] = str(args.cache_size)
+        os.chdir(directory)
+        main_module = importlib.import_module('Apps.main')
+        main_module.movie_sys.wait_ready()
+        main_module.movie_sys.posters = PosterResolver(SlowPosterBackend(args.poster_latency), PosterCache(),
+                                                       max_workers=64)
+
+        latencies, statuses = asyncio.run(run(main_module.app, movies_df, args))
+        main_module.cpu_executor.shutdown()
+        main_module.io_executor.shutdown()
+
+    total = sum(statuses.values())
+    print(f"{total} solicitudes en {args.seconds:.0f} s con {args.clients} clientes: "
+          f"{total / args.seconds:.1f} req/s  estados={dict(statuses)}")
+    for kind, values in latencies.items():
+        print(f"{kind:<15} n={len(values):6d}  p50={np.percentile(values, 50):8.1f} ms  "
+              f"p99={np.percentile(values, 99):8.1f} ms")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Suite de benchmarks del recomendador con salida JSON para seguimiento de regresiones.
+
+Para cada tamaño de catálogo sintético (Benchmarks.synthetic) mide:
+- construcción: tiempo y pico de memoria (tracemalloc) del dataset columnar, las
+  matrices TF-IDF, el índice exacto de vecinos y el índice ANN;
+- tamaño en disco de cada artefacto;
+- arranque de MovieSys (tiempo y memoria del catálogo);
+- latencia p50/p95/p99 por endpoint de MovieSys (sin HTTP ni pósters);
+- calidad: overlap@K de las recomendaciones del modo ANN y del respaldo por
+  géneros respecto del modo exacto.
+
+Uso (desde la raíz del repositorio):
+    python -m Benchmarks.suite --sizes 5000 20000 --queries 200 --output resultados.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from Apps.ann import build_ann_index, save_ann_index
+from Apps.models2 import MovieSys
+from Apps.neighbors import build_tfidf_matrices, build_neighbor_index, save_neighbor_index
+from Apps.posters import PosterResolver
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import guardar_columnar, tipar_dataset
+from ETL_functs.text_store import text_store_path
+
+
+def measured(func, *args, **kwargs):
+    """Ejecuta func y devuelve (resultado, {'seconds', 'peak_mb'})."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": round(seconds, 4), "peak_mb": round(peak / 1e6, 2)}
+
+
+def latency(func, arguments) -> dict:
+    timings = []
+    for args in arguments:
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {"n": len(timings), "p50_ms": round(p50, 4), "p95_ms": round(p95, 4), "p99_ms": round(p99, 4)}
+
+
+def overlap_at_k(reference: list, other: list, k: int) -> float:
+    overlaps = [len(set(a[:k]) & set(b[:k])) / k for a, b in zip(reference, other) if len(a) >= k]
+    return round(float(np.mean(overlaps)), 4) if overlaps else None
+
+
+def file_mb(path: str):
+    return round(os.path.getsize(path) / 1e6, 3) if os.path.exists(path) else None
+
+
+def bench_size(n_movies: int, args, directory: str) -> dict:
+    result = {"n_movies": n_movies, "build": {}, "artifacts_mb": {}, "startup": {}, "latency": {}, "quality": {}}
+    movies_path = os.path.join(directory, 'movies.parquet')
+    neighbors_path = os.path.join(directory, 'neighbors.bin')
+    ann_path = os.path.join(directory, 'ann.npz')
+
+    # Construcción de artefactos
+    catalog = make_catalog(n_movies, seed=args.seed)
+    _, result["build"]["dataset"] = measured(guardar_columnar, catalog, movies_path)
+    movies_df = tipar_dataset(catalog)
+    (tfidf_matrix, genres_matrix), result["build"]["tfidf"] = measured(build_tfidf_matrices, movies_df)
+    neighbor_index, result["build"]["neighbors"] = measured(
+        build_neighbor_index, tfidf_matrix, genres_matrix, k=args.k, ids=movies_df['id'])
+    save_neighbor_index(neighbors_path, neighbor_index)
+    ann_index, result["build"]["ann"] = measured(
+        build_ann_index, tfidf_matrix, genres_matrix, n_components=args.ann_components, k=args.k)
+    save_ann_index(ann_path, ann_index)
+    for name, path in (("dataset", movies_path), ("overview", text_store_path(movies_path)),
+                       ("neighbors", neighbors_path), ("ann", ann_path)):
+        result["artifacts_mb"][name] = file_mb(path)
+
+    # Arranque
+    posters = PosterResolver()
+    exact_sys, result["startup"]["exact"] = measured(MovieSys, movies_path, neighbors_path, posters)
+    ann_sys, result["startup"]["ann"] = measured(MovieSys, movies_path, None, posters,
+                                                 ann_path=ann_path, neighbors_mode='ann')
+    result["startup"]["memory_mb"] = round(exact_sys.memory_report()["total"] / 1e6, 3)
+
+    # Latencia por endpoint
+    rng = np.random.default_rng(args.seed)
+    positions = rng.choice(n_movies, min(args.queries, n_movies), replace=False)
+    titles = [(movies_df['title'].iloc[p],) for p in positions]
+    actors = [(movies_df['cast'].iloc[p][0],) for p in positions if movies_df['cast'].iloc[p]]
+    directors = [(movies_df['crew'].iloc[p][0],) for p in positions if movies_df['crew'].iloc[p]]
+    months = [(m,) for m in rng.choice(list(exact_sys.month_map), len(positions))]
+    days = [(d,) for d in rng.choice(list(exact_sys.day_map), len(positions))]
+    endpoints = {
+        "cantidad_filmaciones_mes": (exact_sys.cantidad_filmaciones_mes, months),
+        "cantidad_filmaciones_dia": (exact_sys.cantidad_filmaciones_dia, days),
+        "score_titulo": (exact_sys.score_titulo, titles),
+        "votos_titulo": (exact_sys.votos_titulo, titles),
+        "get_actor": (exact_sys.get_actor, actors),
+        "get_director": (exact_sys.get_director, directors),
+        "recomendacion": (lambda t: exact_sys.recomendacion(t, args.n, posters=False), titles),
+        "recomendacion_ann": (lambda t: ann_sys.recomendacion(t, args.n, posters=False), titles),
+    }
+    for name, (func, arguments) in endpoints.items():
+        result["latency"][name] = latency(func, arguments)
+    batch_titles = [t for (t,) in titles]
+    start = time.perf_counter()
+    for _ in list(exact_sys.recomendacion_batch(titulos=batch_titles, n_recommendations=args.n)):
+        pass
+    result["latency"]["recomendacion_batch_per_title_ms"] = round(
+        (time.perf_counter() - start) * 1000 / len(batch_titles), 4)
+
+    # Calidad frente al modo exacto
+    exact = [exact_sys._recommend_positions(p, args.n).tolist() for p in positions]
+    approximate = [ann_sys._recommend_positions(p, args.n).tolist() for p in positions]
+    fallback = [exact_sys._genre_fallback_positions(p, args.n).tolist() for p in positions]
+    result["quality"] = {
+        f"ann_overlap@{args.n}": overlap_at_k(exact, approximate, args.n),
+        f"genre_fallback_overlap@{args.n}": overlap_at_k(exact, fallback, args.n),
+    }
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=50, help="Vecinos por película del índice exacto")
+    parser.add_argument('--n', type=int, default=5, help="Recomendaciones por consulta (K de overlap@K)")
+    parser.add_argument('--ann-components', type=int, default=128)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Archivo JSON de resultados (por defecto, salida estándar)")
+    args = parser.parse_args()
+
+    report = {
+        "created_at": pd.Timestamp.now(tz='UTC').isoformat(),
+        "commit": git_commit(),
+        "environment": {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                        "scikit-learn": sklearn.__version__, "cpus": os.cpu_count()},
+        "parameters": vars(args),
+        "results": [],
+    }
+    for n_movies in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            report["results"].append(bench_size(n_movies, args, directory))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Resultados guardados en {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Generador de catálogos sintéticos con el mismo esquema que Datasets/test.csv
+(listas desanidadas serializadas como texto), para benchmarks reproducibles.
+"""
+import numpy as np
+import pandas as pd
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family',
+          'Fantasy', 'History', 'Horror', 'Music', 'Mystery', 'Romance', 'Science Fiction', 'Thriller',
+          'War', 'Western']
+WORDS = ('love war space robot family murder city dream king island ship school secret time magic ghost '
+         'heist hero journey revenge friendship prison storm desert village detective alien treasure').split()
+
+
+def make_catalog(n_movies: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_actors = max(50, n_movies // 2)
+    n_directors = max(20, n_movies // 10)
+    n_collections = max(5, n_movies // 50)
+
+    genres = [str(rng.choice(GENRES, rng.integers(1, 4), replace=False).tolist()) for _ in range(n_movies)]
+    cast = [str([f"Actor {a}" for a in rng.choice(n_actors, 5, replace=False)]) for _ in range(n_movies)]
+    crew = [str([f"Director {rng.integers(n_directors)}"]) for _ in range(n_movies)]
+    overview = [' '.join(rng.choice(WORDS, rng.integers(8, 40))) for _ in range(n_movies)]
+    release_date = pd.Timestamp('1960-01-01') + pd.to_timedelta(rng.integers(0, 23000, n_movies), unit='D')
+    collection = np.where(rng.random(n_movies) < 0.1, rng.integers(0, n_collections, n_movies).astype(str), None)
+    budget = rng.integers(0, 200_000_000, n_movies).astype(float)
+    revenue = rng.integers(0, 600_000_000, n_movies).astype(float)
+
+    return pd.DataFrame({
+        'budget': budget,
+        'genres': genres,
+        'id': np.arange(1, n_movies + 1),
+        'imdb_id': [f"tt{i:07d}" for i in range(n_movies)],
+        'original_language': rng.choice(['en', 'fr', 'es', 'de', 'ja'], n_movies, p=[0.8, 0.05, 0.05, 0.05, 0.05]),
+        'overview': overview,
+        'popularity': rng.gamma(2.0, 3.0, n_movies),
+        'production_companies': [str([f"Company {c}"]) for c in rng.integers(0, 500, n_movies)],
+        'production_countries': "['United States of America']",
+        'release_date': release_date.strftime('%Y-%m-%d'),
+        'revenue': revenue,
+        'runtime': rng.integers(70, 180, n_movies).astype(float),
+        'spoken_languages': "['English']",
+        'status': 'Released',
+        'tagline': '',
+        'title': [f"Movie {i}" for i in range(n_movies)],
+        'vote_average': np.round(rng.random(n_movies) * 10, 1),
+        'vote_count': rng.integers(0, 15000, n_movies).astype(float),
+        'belongs_to_collection': [f"Collection {c}" if c is not None else np.nan for c in collection],
+        'cast': cast,
+        'crew': crew,
+        'release_year': release_date.year,
+        'return': np.where(budget != 0, revenue / np.where(budget != 0, budget, 1), 0),
+    })
+
+
+def make_raw_movies(n_movies: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Campos anidados crudos de movies_dataset.csv + credits.csv (repr de Python de
+    listas de diccionarios, como en TMDB), para medir el desanidado del ETL.
+    """
+    rng = np.random.default_rng(seed)
+
+    def listing(names, **extra):
+        return str([{'id': int(rng.integers(1, 100000)), 'name': name, **extra} for name in names])
+
+    def cast_member(order):
+        return {'cast_id': int(rng.integers(1, 100)), 'character': f"Character {rng.integers(1000)}",
+                'credit_id': f"52fe4{rng.integers(10**8):08x}", 'gender': int(rng.integers(0, 3)),
+                'id': int(rng.integers(1, 10**6)), 'name': f"Actor {rng.integers(n_movies)}",
+                'order': order, 'profile_path': f"/{rng.integers(10**8)}.jpg"}
+
+    def crew_member():
+        job = str(rng.choice(['Director', 'Screenplay', 'Producer', 'Editor', 'Original Music Composer']))
+        return {'credit_id': f"52fe4{rng.integers(10**8):08x}", 'department': 'Crew', 'gender': int(rng.integers(0, 3)),
+                'id': int(rng.integers(1, 10**6)), 'job': job, 'name': f"Person {rng.integers(n_movies)}",
+                'profile_path': None}
+
+    return pd.DataFrame({
+        'belongs_to_collection': [
+            str({'id': int(rng.integers(1, 10**5)), 'name': f"Collection {rng.integers(500)}",
+                 'poster_path': '/p.jpg', 'backdrop_path': '/b.jpg'}) if rng.random() < 0.1 else np.nan
+            for _ in range(n_movies)
+        ],
+        'genres': [listing(rng.choice(GENRES, rng.integers(0, 4), replace=False).tolist()) for _ in range(n_movies)],
+        'production_companies': [listing([f"Company {c}" for c in rng.integers(0, 500, rng.integers(0, 4))])
+                                 for _ in range(n_movies)],
+        'production_countries': [str([{'iso_3166_1': 'US', 'name': 'United States of America'}])] * n_movies,
+        'spoken_languages': [str([{'iso_639_1': 'en', 'name': 'English'}])] * n_movies,
+        'cast': [str([cast_member(order) for order in range(rng.integers(0, 30))]) for _ in range(n_movies)],
+        'crew': [str([crew_member() for _ in range(rng.integers(0, 40))]) for _ in range(n_movies)],
+    })
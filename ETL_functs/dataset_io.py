@@ -0,0 +1,112 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ETL_functs.desanida_ import parsear_lista
+from ETL_functs.text_store import TextStore, text_store_path
+
+# Columnas que el ETL desanida a listas de nombres
+LIST_COLUMNS = ['genres', 'production_companies', 'production_countries', 'spoken_languages', 'cast', 'crew']
+# Columnas de texto con pocos valores distintos
+CATEGORICAL_COLUMNS = ['original_language', 'status', 'belongs_to_collection']
+
+
+def tipar_dataset(movies_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte el dataset del ETL a tipos reales: listas de Python en las columnas
+    desanidadas, fechas en 'release_date' y categorías en las columnas repetitivas.
+    """
+    movies_df = movies_df.copy()
+    for column in LIST_COLUMNS:
+        if column in movies_df.columns:
+            movies_df[column] = movies_df[column].map(parsear_lista)
+    if 'release_date' in movies_df.columns:
+        movies_df['release_date'] = pd.to_datetime(movies_df['release_date'], format='%Y-%m-%d', errors='coerce')
+    for column in CATEGORICAL_COLUMNS:
+        if column in movies_df.columns:
+            movies_df[column] = movies_df[column].astype('category')
+    return movies_df
+
+
+def guardar_columnar(movies_df: pd.DataFrame, path: str):
+    # Sinopsis en un archivo aparte que la API mapea en memoria (se escribe antes que el Parquet)
+    if 'overview' in movies_df.columns:
+        TextStore.from_values(movies_df['overview']).save(text_store_path(path), ids=movies_df['id'])
+    # Parquet conserva las listas como columnas de tipo lista y las categorías como diccionarios
+    tipar_dataset(movies_df).to_parquet(path, index=False)
+
+
+def _esquema_ampliado(esquema: pa.Schema) -> pa.Schema:
+    # Índices de diccionario de 32 bits: las filas agregadas pueden traer categorías que el archivo no tenía
+    campos = [pa.field(campo.name, pa.dictionary(pa.int32(), campo.type.value_type), campo.nullable)
+              if pa.types.is_dictionary(campo.type) else campo for campo in esquema]
+    return pa.schema(campos, metadata=esquema.metadata)
+
+
+def actualizar_columnar(path: str, conservar: np.ndarray, nuevas: pd.DataFrame = None):
+    """
+    Reescribe el dataset Parquet conservando las filas del archivo actual marcadas en
+    `conservar` (máscara booleana, en su orden) y agregando `nuevas` al final. Las
+    filas conservadas se copian grupo a grupo sin pasar por pandas, de modo que un
+    refresco incremental no carga el dataset completo en memoria.
+    """
+    archivo = pq.ParquetFile(path)
+    esquema = _esquema_ampliado(archivo.schema_arrow)
+    conservar = np.asarray(conservar, dtype=bool)
+    tabla_nueva = None
+    if nuevas is not None and len(nuevas):
+        tabla_nueva = pa.Table.from_pandas(tipar_dataset(nuevas)[esquema.names], schema=esquema, preserve_index=False)
+
+    # Sinopsis: las conservadas (solo esa columna del Parquet) + las nuevas, antes que el Parquet
+    if 'overview' in esquema.names:
+        previas = archivo.read(columns=['id', 'overview'])
+        overviews = np.array(previas.column('overview').to_pylist(), dtype=object)
+        textos = overviews[conservar].tolist() + (nuevas['overview'].tolist() if tabla_nueva is not None else [])
+        ids = previas.column('id').to_pandas()[conservar].tolist() + (nuevas['id'].tolist() if tabla_nueva is not None else [])
+        TextStore.from_values(textos).save(text_store_path(path), ids=ids)
+
+    tmp_path = f"{path}.tmp"
+    with pq.ParquetWriter(tmp_path, esquema) as writer:
+        inicio = 0
+        for lote in archivo.iter_batches():
+            mascara = conservar[inicio:inicio + lote.num_rows]
+            inicio += lote.num_rows
+            if mascara.any():
+                writer.write_table(pa.Table.from_batches([lote.filter(pa.array(mascara))]).cast(esquema))
+        if tabla_nueva is not None:
+            writer.write_table(tabla_nueva)
+    os.replace(tmp_path, path)
+
+
+def cargar_dataset(path: str) -> pd.DataFrame:
+    """
+    Carga el dataset de películas desde Parquet (formato columnar del ETL) o desde
+    el CSV heredado, devolviendo en ambos casos el mismo esquema tipado.
+    """
+    if path.endswith('.parquet'):
+        movies_df = pd.read_parquet(path)
+        # pyarrow devuelve las listas como arrays de NumPy; se normalizan a listas de Python
+        for column in LIST_COLUMNS:
+            if column in movies_df.columns:
+                movies_df[column] = [value.tolist() if isinstance(value, np.ndarray) else parsear_lista(value)
+                                     for value in movies_df[column]]
+        return movies_df
+    return tipar_dataset(pd.read_csv(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte el CSV del ETL (test.csv) al formato columnar Parquet.")
+    parser.add_argument('csv_path', nargs='?', default='Datasets/test.csv')
+    parser.add_argument('parquet_path', nargs='?', default='Datasets/movies.parquet')
+    args = parser.parse_args()
+
+    guardar_columnar(pd.read_csv(args.csv_path), args.parquet_path)
+    print(f"{args.parquet_path} generado ({os.path.getsize(args.parquet_path) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 import ast
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 
 def desanida_column(extract_value: str, text, limit: int = None):
     # Verificar si el valor es una cadena y no está vacío
@@ -32,4 +36,138 @@ def extraer_directores(text):
         except (ValueError, SyntaxError, TypeError):
             return np.nan
     # Retornar NaN si text no es una cadena válida o es NaN
-    return np.nan
\ No newline at end of file
+    return np.nan
+
+def parsear_lista(value):
+    # Convertir una lista serializada como texto (salida de desanida_column / extraer_directores) a lista
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str) and value not in ['', 'None']:
+        try:
+            data = ast.literal_eval(value)
+            if isinstance(data, (list, tuple)):
+                return [item for item in data if isinstance(item, str)]
+        except (ValueError, SyntaxError, TypeError):
+            pass
+    # Retornar lista vacía si el valor no es una lista válida
+    return []
+
+
+# ---------------------------------------------------------------------------
+# Desanidado rápido: extrae los valores con expresiones regulares sobre el texto
+# con el formato de TMDB (repr de Python, comillas simples o dobles) en lugar de
+# construir cada lista de diccionarios con ast.literal_eval. Si el texto tiene
+# una forma inesperada, se recurre a las funciones originales para no cambiar
+# el resultado.
+# ---------------------------------------------------------------------------
+_VALOR_RE = r"""(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)")"""
+_NAME_RE = re.compile(r"'name': " + _VALOR_RE)
+_DICT_RE = re.compile(r"\{[^{}]*\}")
+# Estructura esperada una vez reducido cada diccionario a '{}': "[]", "[{}]", "[{}, {}, ...]" o "{}"
+_LISTA_RE = re.compile(r"\s*\[\s*(?:\{\}\s*(?:,\s*\{\}\s*)*)?\]\s*")
+_DICT_SOLO_RE = re.compile(r"\s*\{\}\s*")
+
+
+def _estructura_valida(text: str, patron) -> bool:
+    # Los corchetes y llaves deben cerrar (un texto truncado no pasa) y no puede haber nada entre
+    # los diccionarios; si no, el camino lento decide (ast.literal_eval da NaN ante texto inválido)
+    return patron.fullmatch(_DICT_RE.sub('{}', text)) is not None
+
+# Campos anidados del dataset y cómo se desanida cada uno: (clave, límite) o 'directores'
+CAMPOS_ANIDADOS = {
+    'belongs_to_collection': ('name', None),
+    'genres': ('name', None),
+    'production_companies': ('name', None),
+    'production_countries': ('name', None),
+    'spoken_languages': ('name', None),
+    'cast': ('name', 5),
+    'crew': 'directores',
+}
+
+
+def _valor(match):
+    # Devuelve el string capturado, deshaciendo los escapes de repr si los hay
+    value = match.group(match.lastindex)
+    if '\\' in value:
+        quote = "'" if match.lastindex == 1 else '"'
+        value = ast.literal_eval(quote + value + quote)
+    return value
+
+
+def extraer_nombres(text, limit: int = None):
+    """
+    Equivalente rápido de desanida_column('name', text, limit).
+    """
+    if not isinstance(text, str) or text in ['', 'None']:
+        return np.nan
+    stripped = text.lstrip()
+    if stripped.startswith('[') and _estructura_valida(text, _LISTA_RE):
+        matches = list(_NAME_RE.finditer(text))
+        # Cada diccionario debe aportar exactamente un 'name'; si no, camino lento
+        if len(matches) != text.count('{'):
+            return desanida_column('name', text, limit)
+        values = [_valor(m) for m in matches]
+        return values[:limit] if limit is not None else values
+    if stripped.startswith('{') and _estructura_valida(text, _DICT_SOLO_RE):
+        match = _NAME_RE.search(text)
+        return _valor(match) if match is not None else desanida_column('name', text, limit)
+    return desanida_column('name', text, limit)
+
+
+def extraer_directores_rapido(text):
+    """
+    Equivalente rápido de extraer_directores(text).
+    """
+    if not isinstance(text, str) or text in ['', 'None']:
+        return np.nan
+    if not text.lstrip().startswith('[') or not _estructura_valida(text, _LISTA_RE):
+        return extraer_directores(text)
+    dicts = _DICT_RE.findall(text)
+    if len(dicts) != text.count('{'):
+        return extraer_directores(text)
+    directors = []
+    for item in dicts:
+        if "'job': 'Director'" in item:
+            match = _NAME_RE.search(item)
+            directors.append(_valor(match) if match is not None else np.nan)
+    return directors
+
+
+def desanidar_fila(valores: dict) -> dict:
+    # Desanida en una sola pasada todos los campos anidados presentes en la fila
+    resultado = {}
+    for column, value in valores.items():
+        regla = CAMPOS_ANIDADOS[column]
+        if regla == 'directores':
+            resultado[column] = extraer_directores_rapido(value)
+        else:
+            resultado[column] = extraer_nombres(value, regla[1])
+    return resultado
+
+
+def _desanidar_bloque(bloque: pd.DataFrame) -> pd.DataFrame:
+    columns = [c for c in CAMPOS_ANIDADOS if c in bloque.columns]
+    filas = [desanidar_fila(dict(zip(columns, values))) for values in zip(*(bloque[c] for c in columns))]
+    return pd.DataFrame(filas, index=bloque.index, columns=columns)
+
+
+def desanidar_dataset(df: pd.DataFrame, procesos: int = 1, tamano_bloque: int = 5000) -> pd.DataFrame:
+    """
+    Desanida todas las columnas de CAMPOS_ANIDADOS del DataFrame (una pasada por fila)
+    y devuelve una copia con las columnas reemplazadas. Con procesos > 1 los bloques
+    de `tamano_bloque` filas se reparten en un pool de procesos.
+    """
+    columns = [c for c in CAMPOS_ANIDADOS if c in df.columns]
+    bloques = [df[columns].iloc[start:start + tamano_bloque] for start in range(0, len(df), tamano_bloque)]
+    if procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_desanidar_bloque, bloques))
+    else:
+        resultados = [_desanidar_bloque(bloque) for bloque in bloques]
+
+    df = df.copy()
+    if resultados:
+        desanidado = pd.concat(resultados)
+        for column in columns:
+            df[column] = desanidado[column]
+    return df
@@ -0,0 +1,310 @@
+"""
+Pipeline ETL + modelo por línea de comandos (reemplaza las celdas de Notebook/Modelo.ipynb).
+
+Lee movies_dataset.csv y credits.csv por bloques, calcula una huella (hash) de cada
+fila de origen y, en ejecuciones posteriores, solo vuelve a desanidar y vectorizar
+las películas nuevas o modificadas y actualiza sus entradas en el índice de vecinos.
+
+Los vectorizadores TF-IDF quedan congelados entre ejecuciones incrementales: los
+términos que solo aparecen en películas nuevas se ignoran y los IDF no se
+actualizan, por lo que el resultado se aleja poco a poco del de una reconstrucción
+completa. Cuando las filas cambiadas o eliminadas desde el último ajuste superan
+`--umbral-reajuste` (fracción del catálogo de ese ajuste), la ejecución pasa a ser
+una reconstrucción completa que vuelve a ajustarlos.
+
+Uso (desde la raíz del repositorio):
+    python -m ETL_functs.pipeline --movies Datasets/movies_dataset.csv --credits Datasets/credits.csv
+    python -m ETL_functs.pipeline --completo   # reconstrucción total
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from Apps.description import DescriptionIndex, save_description_index
+from Apps.neighbors import (build_content, _as_text, content_vectorizer, build_neighbor_index, update_neighbor_index,
+                            load_neighbor_index, save_neighbor_index)
+from ETL_functs.dataset_io import actualizar_columnar, guardar_columnar
+from ETL_functs.desanida_ import desanidar_dataset
+
+COLUMNAS_DESCARTADAS = ['video', 'adult', 'original_title', 'poster_path', 'homepage']
+COLUMNAS_NUMERICAS = ['budget', 'popularity', 'revenue', 'runtime', 'vote_average', 'vote_count']
+# Fracción de filas cambiadas o eliminadas (acumulada desde el último ajuste) que fuerza a reajustar el TF-IDF
+UMBRAL_REAJUSTE = 0.1
+
+
+def huellas(chunk: pd.DataFrame) -> pd.Series:
+    # Hash de 64 bits del contenido crudo de cada fila, indexado por id
+    return pd.Series(pd.util.hash_pandas_object(chunk, index=False).to_numpy(), index=chunk['id'].to_numpy())
+
+
+def huellas_credits(credits_path: str, tamano_bloque: int) -> pd.Series:
+    partes = [huellas(chunk) for chunk in pd.read_csv(credits_path, dtype=str, chunksize=tamano_bloque)]
+    fp = pd.concat(partes) if partes else pd.Series(dtype=np.uint64)
+    return fp[~fp.index.duplicated()]
+
+
+def huellas_movies(movies_path: str, credits_fp: pd.Series, tamano_bloque: int) -> pd.DataFrame:
+    # Huellas de movies y credits por id; solo películas con créditos (el merge es inner) y la primera aparición de cada id
+    partes = []
+    vistos = set()
+    for chunk in pd.read_csv(movies_path, dtype=str, chunksize=tamano_bloque):
+        chunk = chunk.drop_duplicates('id')
+        chunk = chunk[chunk['id'].isin(credits_fp.index) & ~chunk['id'].isin(vistos)]
+        vistos.update(chunk['id'])
+        partes.append(pd.DataFrame({'movie_fp': huellas(chunk),
+                                    'credits_fp': credits_fp.reindex(chunk['id']).to_numpy()}))
+    return pd.concat(partes) if partes else pd.DataFrame(columns=['movie_fp', 'credits_fp'])
+
+
+def _desanidar(df: pd.DataFrame, procesos: int) -> pd.DataFrame:
+    # Un bloque por proceso del pool
+    return desanidar_dataset(df, procesos=procesos, tamano_bloque=max(1, -(-len(df) // procesos)))
+
+
+def leer_credits(credits_path: str, ids: set, tamano_bloque: int, procesos: int = 1) -> pd.DataFrame:
+    # Segunda pasada sobre credits.csv quedándose solo con las filas pedidas, ya desanidadas:
+    # en memoria quedan las listas de nombres, no el JSON crudo del reparto y el equipo
+    partes = []
+    vistos = set()
+    for chunk in pd.read_csv(credits_path, dtype=str, chunksize=tamano_bloque):
+        chunk = chunk[chunk['id'].isin(ids) & ~chunk['id'].isin(vistos)].drop_duplicates('id')
+        vistos.update(chunk['id'])
+        if len(chunk):
+            partes.append(_desanidar(chunk, procesos))
+    return pd.concat(partes) if partes else pd.DataFrame(columns=['id'])
+
+
+def transformar(merged_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica a las filas ya unidas (movies + credits) y desanidadas las mismas
+    transformaciones del notebook: filtro de idioma inglés, limpieza de montos,
+    fechas, filtro desde 1960, columna 'return' y descarte de columnas sin uso.
+    """
+    merged_df = merged_df[merged_df['spoken_languages'].apply(lambda x: 'English' in x if isinstance(x, list) else False)]
+
+    merged_df = merged_df.copy()
+    merged_df['id'] = pd.to_numeric(merged_df['id'], errors='coerce')
+    merged_df = merged_df.dropna(subset=['id'])
+    merged_df['id'] = merged_df['id'].astype(np.int64)
+    for column in COLUMNAS_NUMERICAS:
+        if column in merged_df.columns:
+            merged_df[column] = pd.to_numeric(merged_df[column], errors='coerce')
+    merged_df[['revenue', 'budget', 'popularity']] = merged_df[['revenue', 'budget', 'popularity']].fillna(0)
+
+    merged_df = merged_df.dropna(subset=['release_date'])
+    merged_df['release_date'] = pd.to_datetime(merged_df['release_date'], format='%Y-%m-%d', errors='coerce')
+    merged_df['release_year'] = merged_df['release_date'].dt.year
+    merged_df = merged_df[merged_df['release_year'] >= 1960].copy()
+    merged_df['release_year'] = merged_df['release_year'].astype(np.int64)
+
+    merged_df['return'] = np.where(merged_df['budget'] != 0, merged_df['revenue'] / merged_df['budget'].replace(0, 1), 0)
+    return merged_df.drop(columns=[c for c in COLUMNAS_DESCARTADAS if c in merged_df.columns])
+
+
+def procesar(movies_path: str, credits_path: str, ids: set, tamano_bloque: int, procesos: int = 1):
+    """
+    Desanida y transforma las películas `ids` recorriendo movies.csv por bloques; la
+    memoria queda acotada por un bloque crudo más las filas ya transformadas (también
+    en la primera ejecución, que procesa todo el origen). None si no queda ninguna.
+    """
+    if not ids:
+        return None
+    credits_df = leer_credits(credits_path, ids, tamano_bloque, procesos)
+    partes = []
+    vistos = set()
+    for chunk in pd.read_csv(movies_path, dtype=str, chunksize=tamano_bloque):
+        chunk = chunk.drop_duplicates('id')
+        chunk = chunk[chunk['id'].isin(ids) & ~chunk['id'].isin(vistos)]
+        vistos.update(chunk['id'])
+        if len(chunk):
+            merged_df = pd.merge(_desanidar(chunk, procesos), credits_df, on='id', how='inner')
+            partes.append(transformar(merged_df))
+    return pd.concat(partes, ignore_index=True) if partes else None
+
+
+class EstadoPipeline:
+    """
+    Estado persistido entre ejecuciones: huellas de cada id de origen, los
+    vectorizadores TF-IDF ajustados (para que los scores sigan siendo comparables),
+    las matrices TF-IDF de las filas del dataset (para vectorizar solo las cambiadas)
+    y el registro del último ajuste (filas de origen y cambios acumulados desde entonces).
+    """
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self.huellas_path = os.path.join(directorio, 'huellas.parquet')
+        self.vectorizadores_path = os.path.join(directorio, 'vectorizadores.pkl')
+        self.matrices_path = os.path.join(directorio, 'matrices.npz')
+        self.ajuste_path = os.path.join(directorio, 'ajuste.json')
+
+    def existe(self) -> bool:
+        return all(os.path.exists(path) for path in (self.huellas_path, self.vectorizadores_path,
+                                                     self.matrices_path, self.ajuste_path))
+
+    def cargar_huellas(self) -> pd.DataFrame:
+        return pd.read_parquet(self.huellas_path).set_index('id')
+
+    def guardar_huellas(self, fp: pd.DataFrame):
+        os.makedirs(self.directorio, exist_ok=True)
+        fp.rename_axis('id').reset_index().to_parquet(self.huellas_path, index=False)
+
+    def cargar_vectorizadores(self):
+        with open(self.vectorizadores_path, 'rb') as f:
+            return pickle.load(f)
+
+    def guardar_vectorizadores(self, vectorizadores):
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self.vectorizadores_path, 'wb') as f:
+            pickle.dump(vectorizadores, f)
+
+    def cargar_matrices(self):
+        # (ids, matriz de contenido, matriz de géneros) en el orden de las filas del dataset
+        with np.load(self.matrices_path, allow_pickle=False) as data:
+            matrices = [sp.csr_matrix((data[f"{name}_data"], data[f"{name}_indices"], data[f"{name}_indptr"]),
+                                      shape=tuple(data[f"{name}_shape"])) for name in ('tfidf', 'genres')]
+            return data["ids"], matrices[0], matrices[1]
+
+    def guardar_matrices(self, ids, tfidf_matrix, genres_matrix):
+        os.makedirs(self.directorio, exist_ok=True)
+        arrays = {"ids": np.asarray(ids, dtype=np.int64)}
+        for name, matrix in (('tfidf', tfidf_matrix), ('genres', genres_matrix)):
+            matrix = sp.csr_matrix(matrix)
+            arrays.update({f"{name}_data": matrix.data, f"{name}_indices": matrix.indices,
+                           f"{name}_indptr": matrix.indptr, f"{name}_shape": np.array(matrix.shape, dtype=np.int64)})
+        with open(self.matrices_path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    def cargar_ajuste(self) -> dict:
+        with open(self.ajuste_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def guardar_ajuste(self, filas: int, cambios: int):
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self.ajuste_path, 'w', encoding='utf-8') as f:
+            json.dump({"filas": filas, "cambios": cambios}, f)
+
+
+def matrices_tfidf(movies_df: pd.DataFrame, vectorizadores):
+    tfidf, tfidf_genres = vectorizadores
+    return (normalize(tfidf.transform(build_content(movies_df))).tocsr(),
+            normalize(tfidf_genres.transform(_as_text(movies_df['genres']))).tocsr())
+
+
+def ejecutar(movies_path: str, credits_path: str, salida_path: str, vecinos_path: str, estado_dir: str,
+             completo: bool = False, k: int = 50, tamano_bloque: int = 5000, procesos: int = 1,
+             descripciones_path: str = None, umbral_reajuste: float = UMBRAL_REAJUSTE) -> int:
+    """Ejecuta el pipeline y devuelve la cantidad de películas del dataset generado."""
+    inicio = time.perf_counter()
+    estado = EstadoPipeline(estado_dir)
+    incremental = not completo and estado.existe() and os.path.exists(salida_path) and os.path.exists(vecinos_path)
+
+    # 1. Huellas de credits y de movies, leídos por bloques (sin retener las filas crudas)
+    credits_fp = huellas_credits(credits_path, tamano_bloque)
+    nuevas_huellas = huellas_movies(movies_path, credits_fp, tamano_bloque)
+    ids_cambiados = set(nuevas_huellas.index)
+    cambios = 0
+
+    # 2. ¿Alcanza con un refresco incremental? No si el estado no corresponde al dataset
+    # o si los cambios acumulados desde el último ajuste del TF-IDF superan el umbral
+    if incremental:
+        previos_ids = pq.read_table(salida_path, columns=['id']).column('id').to_numpy()
+        ids_estado, tfidf_previo, genres_previo = estado.cargar_matrices()
+        anteriores = estado.cargar_huellas()
+        previo = anteriores.reindex(nuevas_huellas.index)
+        cambiado = (previo['movie_fp'] != nuevas_huellas['movie_fp']) | (previo['credits_fp'] != nuevas_huellas['credits_fp'])
+        ids_cambiados = set(nuevas_huellas.index[cambiado.to_numpy()])
+        eliminados = len(anteriores.index.difference(nuevas_huellas.index))
+        ajuste = estado.cargar_ajuste()
+        cambios = ajuste["cambios"] + len(ids_cambiados) + eliminados
+        if not np.array_equal(ids_estado, previos_ids):
+            print("El estado del pipeline no corresponde al dataset; reconstrucción completa")
+            incremental = False
+        elif cambios > umbral_reajuste * max(ajuste["filas"], 1):
+            print(f"{cambios} filas cambiadas desde el último ajuste (umbral {umbral_reajuste:.0%} de "
+                  f"{ajuste['filas']}); se reajusta el TF-IDF con una reconstrucción completa")
+            incremental = False
+        if not incremental:
+            ids_cambiados = set(nuevas_huellas.index)
+            cambios = 0
+    print(f"{len(nuevas_huellas)} películas en origen, {len(ids_cambiados)} a procesar")
+
+    # 3. Desanidar y transformar, bloque a bloque, solo las filas pendientes
+    procesadas = procesar(movies_path, credits_path, ids_cambiados, tamano_bloque, procesos)
+    n_nuevas = len(procesadas) if procesadas is not None else 0
+
+    if incremental:
+        # 4. Dataset: filas previas sin cambios (en su orden, copiadas desde el Parquet) + reprocesadas al final
+        previos_str = pd.Index(previos_ids.astype(str))
+        vigentes = previos_str.isin(nuevas_huellas.index) & ~previos_str.isin(list(ids_cambiados))
+        actualizar_columnar(salida_path, vigentes, procesadas)
+        nuevos_ids = procesadas['id'].to_numpy(dtype=np.int64) if n_nuevas else np.empty(0, dtype=np.int64)
+        ids = np.concatenate([previos_ids[vigentes], nuevos_ids])
+        changed = np.zeros(len(ids), dtype=bool)
+        changed[int(vigentes.sum()):] = True
+
+        # 5. TF-IDF: las filas vigentes salen del estado y solo se vectorizan las reprocesadas
+        vectorizadores = estado.cargar_vectorizadores()
+        tfidf_matrix, genres_matrix = tfidf_previo[vigentes], genres_previo[vigentes]
+        if n_nuevas:
+            nuevas_tfidf, nuevas_genres = matrices_tfidf(procesadas, vectorizadores)
+            tfidf_matrix = sp.vstack([tfidf_matrix, nuevas_tfidf]).tocsr()
+            genres_matrix = sp.vstack([genres_matrix, nuevas_genres]).tocsr()
+        neighbor_index = update_neighbor_index(load_neighbor_index(vecinos_path), tfidf_matrix, genres_matrix,
+                                               ids, changed)
+    else:
+        # 4-5. Reconstrucción: dataset completo, vectorizadores reajustados e índice de vecinos desde cero
+        movies_df = procesadas if procesadas is not None else pd.DataFrame()
+        guardar_columnar(movies_df, salida_path)
+        ids = movies_df['id'].to_numpy(dtype=np.int64)
+        changed = np.ones(len(ids), dtype=bool)
+        vectorizadores = (content_vectorizer().fit(build_content(movies_df)),
+                          content_vectorizer().fit(_as_text(movies_df['genres'])))
+        tfidf_matrix, genres_matrix = matrices_tfidf(movies_df, vectorizadores)
+        neighbor_index = build_neighbor_index(tfidf_matrix, genres_matrix, k=k, ids=ids)
+
+    # 6. Persistir artefactos y estado (el estado al final: si algo falla se reprocesa todo lo pendiente)
+    save_neighbor_index(vecinos_path, neighbor_index)
+    if descripciones_path:
+        # Vocabulario, IDF y matriz de documentos para la búsqueda por descripción
+        save_description_index(descripciones_path, DescriptionIndex.from_vectorizer(vectorizadores[0], tfidf_matrix, ids))
+    estado.guardar_vectorizadores(vectorizadores)
+    estado.guardar_matrices(ids, tfidf_matrix, genres_matrix)
+    estado.guardar_ajuste(ajuste["filas"] if incremental else len(nuevas_huellas), cambios)
+    estado.guardar_huellas(nuevas_huellas)
+    modo = "incremental" if incremental else "completo"
+    print(f"Pipeline {modo}: {len(ids)} películas, {int(changed.sum())} nuevas o modificadas "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    return len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', default='Datasets/movies_dataset.csv')
+    parser.add_argument('--credits', default='Datasets/credits.csv')
+    parser.add_argument('--salida', default='Datasets/movies.parquet')
+    parser.add_argument('--vecinos', default='Datasets/neighbors.bin')
+    parser.add_argument('--descripciones', default='Datasets/description.npz',
+                        help="Índice de búsqueda por descripción ('' para no generarlo)")
+    parser.add_argument('--estado', default='Datasets/etl_state')
+    parser.add_argument('--completo', action='store_true', help="Ignorar el estado previo y reconstruir todo")
+    parser.add_argument('--k', type=int, default=50, help="Vecinos por película (solo en reconstrucción completa)")
+    parser.add_argument('--tamano-bloque', type=int, default=5000)
+    parser.add_argument('--procesos', type=int, default=1)
+    parser.add_argument('--umbral-reajuste', type=float, default=UMBRAL_REAJUSTE,
+                        help="Fracción de filas cambiadas desde el último ajuste que fuerza a reajustar el TF-IDF")
+    args = parser.parse_args()
+
+    ejecutar(args.movies, args.credits, args.salida, args.vecinos, args.estado,
+             args.completo, args.k, args.tamano_bloque, args.procesos, args.descripciones, args.umbral_reajuste)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+# Versión 2: la cabecera incluye además la huella de los ids del dataset (ver `ids_digest`)
+_TEXT_MAGIC = b'MOVTEXT2'
+_TEXT_HEADER = struct.Struct('<8sQ20s')
+_TEXT_MAGIC_V1 = b'MOVTEXT1'
+_TEXT_HEADER_V1 = struct.Struct('<8sQ')
+
+
+def ids_digest(ids) -> bytes:
+    """Huella (SHA-1) de los ids del dataset en orden, tal como los devuelve `cargar_dataset`."""
+    values = pd.to_numeric(pd.Series(ids), errors='coerce').to_numpy(dtype='<f8')
+    return hashlib.sha1(values.tobytes()).digest()
+
+
+class TextStore:
+    """
+    Columna de textos largos (p. ej. 'overview') guardada como un único buffer UTF-8
+    contiguo más un vector de offsets, en lugar de un objeto str de Python por fila.
+    Abierta desde archivo con `open`, el buffer queda mapeado en memoria: no ocupa
+    el heap de cada worker y las páginas se comparten entre procesos.
+
+    `ids` es la huella de los ids de las filas con las que se guardó (None en
+    archivos de la versión 1, que no la tienen): permite comprobar que el archivo
+    corresponde al dataset y no solo que tiene la misma cantidad de filas.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray, mapped: bool = False, ids: bytes = None):
+        self.offsets = offsets
+        self.blob = blob
+        self.mapped = mapped
+        self.ids = ids
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [value.encode('utf-8') if isinstance(value, str) else b'' for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(offsets, blob)
+
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, position: int) -> str:
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        return self.blob[start:stop].tobytes().decode('utf-8')
+
+    def take(self, positions) -> list:
+        return [self[int(position)] for position in positions]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.offsets.nbytes + self.blob.nbytes)
+
+    def save(self, path: str, ids=None):
+        """Guarda los textos con la huella de `ids` (los ids del dataset, en el mismo orden)."""
+        digest = ids_digest(ids) if ids is not None else bytes(20)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_TEXT_HEADER.pack(_TEXT_MAGIC, len(self), digest))
+            f.write(self.offsets.astype('<i8').tobytes())
+            f.write(np.asarray(self.blob).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path: str):
+        with open(path, 'rb') as f:
+            header = f.read(_TEXT_HEADER.size)
+        if header[:8] == _TEXT_MAGIC:
+            _, n_rows, digest = _TEXT_HEADER.unpack(header)
+            header_size, ids = _TEXT_HEADER.size, (digest if any(digest) else None)
+        elif header[:8] == _TEXT_MAGIC_V1:
+            _, n_rows = _TEXT_HEADER_V1.unpack(header[:_TEXT_HEADER_V1.size])
+            header_size, ids = _TEXT_HEADER_V1.size, None
+        else:
+            raise ValueError(f"{path} no es un archivo de textos de MovieSys")
+        offsets = np.memmap(path, dtype='<i8', mode='r', offset=header_size, shape=(n_rows + 1,))
+        blob_offset = header_size + offsets.nbytes
+        blob_size = int(offsets[-1])
+        blob = (np.memmap(path, dtype=np.uint8, mode='r', offset=blob_offset, shape=(blob_size,))
+                if blob_size else np.empty(0, dtype=np.uint8))
+        return cls(offsets, blob, mapped=True, ids=ids)
+
+
+def text_store_path(movies_df_path: str) -> str:
+    # Datasets/movies.parquet → Datasets/movies.overview.bin
+    return f"{os.path.splitext(movies_df_path)[0]}.overview.bin"
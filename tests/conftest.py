@@ -0,0 +1,38 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+from Apps.neighbors import build_tfidf_matrices, build_neighbor_index, save_neighbor_index
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import guardar_columnar, tipar_dataset
+
+
+@pytest.fixture(scope='session')
+def artifacts_dir(tmp_path_factory):
+    """Directorio con Datasets/movies.parquet y Datasets/neighbors.bin de un catálogo sintético chico."""
+    directory = tmp_path_factory.mktemp('artefactos')
+    os.makedirs(directory / 'Datasets')
+    movies_df = make_catalog(300, seed=0)
+    guardar_columnar(movies_df, str(directory / 'Datasets' / 'movies.parquet'))
+    typed_df = tipar_dataset(movies_df)
+    tfidf_matrix, genres_matrix = build_tfidf_matrices(typed_df)
+    save_neighbor_index(str(directory / 'Datasets' / 'neighbors.bin'),
+                        build_neighbor_index(tfidf_matrix, genres_matrix, k=20, ids=typed_df['id']))
+    return directory
+
+
+@pytest.fixture
+def import_main(monkeypatch):
+    """Importa Apps.main desde cero en `directory` (carga sincrónica) y lo descarta al terminar."""
+    def load(directory, **env):
+        monkeypatch.chdir(directory)
+        monkeypatch.setenv("LAZY_LOAD", "0")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        sys.modules.pop('Apps.main', None)
+        return importlib.import_module('Apps.main')
+
+    yield load
+    sys.modules.pop('Apps.main', None)
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from Apps.aggregates import ReleaseDateStats
+from Benchmarks.synthetic import make_catalog
+
+
+def test_release_date_stats_match_pandas_by_year_range():
+    dates = pd.to_datetime(make_catalog(500, seed=2)['release_date'], errors='coerce').dropna()
+    stats = ReleaseDateStats(dates.astype(str))
+    years = dates.dt.year
+
+    for year_from, year_to in [(None, None), (1990, 2000), (2005, None), (None, 1985), (2010, 2005), (1800, 3000)]:
+        in_range = pd.Series(True, index=dates.index)
+        if year_from is not None:
+            in_range &= years >= year_from
+        if year_to is not None:
+            in_range &= years <= year_to
+        for month in range(1, 13):
+            expected = int((in_range & (dates.dt.month == month)).sum())
+            assert stats.count_month(month, year_from, year_to) == expected
+        for weekday in range(7):
+            expected = int((in_range & (dates.dt.dayofweek == weekday)).sum())
+            assert stats.count_weekday(weekday, year_from, year_to) == expected
+
+    assert stats.count_year(int(years.iloc[0])) == int((years == years.iloc[0]).sum())
+    assert stats.count_month(13) == 0 and stats.count_weekday(7) == 0 and stats.count_year(1000) == 0
@@ -0,0 +1,25 @@
+import shutil
+
+from Apps.ann import build_ann_index, load_ann_index, save_ann_index
+from Apps.neighbors import build_tfidf_matrices
+from ETL_functs.dataset_io import cargar_dataset
+
+
+def test_ann_mode_without_exact_neighbors(artifacts_dir, tmp_path, import_main):
+    shutil.copytree(artifacts_dir / 'Datasets', tmp_path / 'Datasets')
+    datasets = tmp_path / 'Datasets'
+    (datasets / 'neighbors.bin').unlink()
+    tfidf_matrix, genres_matrix = build_tfidf_matrices(cargar_dataset(str(datasets / 'movies.parquet')))
+    save_ann_index(str(datasets / 'ann.npz'), build_ann_index(tfidf_matrix, genres_matrix, n_components=16, k=30))
+    assert load_ann_index(str(datasets / 'ann.npz')).k == 30
+
+    main = import_main(tmp_path, NEIGHBORS_MODE='ann')
+    try:
+        movie_sys = main.movie_sys
+        assert movie_sys.ready and movie_sys.neighbors is None
+        title = movie_sys.movies_df['title'].iloc[0]
+        assert len(movie_sys.recomendacion(title, 5, posters=False, vote_weight=0.5)['recommendations']) == 5
+        assert not main.reloader._changed()
+    finally:
+        main.cpu_executor.shutdown()
+        main.io_executor.shutdown()
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from Apps.posters import POSTER_NO_DISPONIBLE
+
+
+def test_posters_keyed_by_imdb_id(artifacts_dir, import_main):
+    main = import_main(artifacts_dir)
+    try:
+        client = TestClient(main.app)
+        response = client.get("/posters", params={"imdb_ids": "tt0000002,tt0000001,,tt0000002"})
+        assert response.status_code == 200
+        assert response.json() == {"posters": {"tt0000002": POSTER_NO_DISPONIBLE, "tt0000001": POSTER_NO_DISPONIBLE}}
+    finally:
+        main.cpu_executor.shutdown()
+        main.io_executor.shutdown()
+
+
+def test_n_recommendations_above_stored_neighbors_rejected(artifacts_dir, import_main):
+    main = import_main(artifacts_dir)
+    try:
+        client = TestClient(main.app)
+        title = main.movie_sys.movies_df['title'].iloc[0]
+        k = main.movie_sys.max_recommendations
+        assert len(client.get(f"/recomendacion/{title}", params={"n_recommendations": k}).json()["recommendations"]) == k
+        assert client.get(f"/recomendacion/{title}", params={"n_recommendations": k + 1}).status_code == 422
+        assert client.post("/recomendacion/batch", json={"titulos": [title], "n_recommendations": 0}).status_code == 422
+    finally:
+        main.cpu_executor.shutdown()
+        main.io_executor.shutdown()
@@ -0,0 +1,16 @@
+import time
+
+from Apps.cache import SqliteResponseBackend
+
+
+def test_shared_backend_purges_expired_rows_and_caps_size(tmp_path):
+    backend = SqliteResponseBackend(str(tmp_path / 'responses.sqlite'), max_rows=3, purge_interval=0)
+    now = time.time()
+    backend.set("vencida", 1, now - 1)
+    backend.set("a", 1, now + 10)
+    assert backend.get("vencida") is None and len(backend) == 1
+    for i, key in enumerate(["b", "c", "d"]):
+        backend.set(key, i, now + 20 + i)
+    # Por encima del tope se descartan las más próximas a vencer
+    assert len(backend) == 3
+    assert backend.get("a") is None and backend.get("d") == 2
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from Apps.catalog import compact_catalog, exact_floats
+from Apps.models2 import MovieSys
+from Apps.posters import PosterResolver
+from ETL_functs.dataset_io import cargar_dataset
+
+
+def test_compact_catalog_downcasts_only_when_values_are_kept():
+    movies_df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'title': ['A', 'B', 'A'],
+        'vote_average': [5.3, 7.1, 0.0],
+        'popularity': [547.488298, 1.5, 0.25],
+        'budget': [30000000.0, 0.0, 1500000.0],
+        'revenue': [123456789.0, 0.0, 1.0],
+    })
+    compact = compact_catalog(movies_df)
+    assert compact['vote_average'].dtype == np.float32 and compact['budget'].dtype == np.float32
+    # 547.488298 y 123456789 no se representan en float32: la columna queda en float64
+    assert compact['popularity'].dtype == np.float64 and compact['revenue'].dtype == np.float64
+    for column in ('vote_average', 'popularity', 'budget', 'revenue'):
+        assert exact_floats(compact[column]).tolist() == movies_df[column].tolist()
+
+
+def test_formatted_output_keeps_original_values(artifacts_dir):
+    movies_path = str(artifacts_dir / 'Datasets' / 'movies.parquet')
+    movie_sys = MovieSys(movies_path, str(artifacts_dir / 'Datasets' / 'neighbors.bin'), PosterResolver())
+    original = cargar_dataset(movies_path).set_index('title')
+    assert movie_sys.movies_df['vote_average'].dtype == np.float32
+
+    title = movie_sys.movies_df['title'].iloc[0]
+    for movie in movie_sys.recomendacion(title, 5, posters=False)['recommendations']:
+        assert movie['vote_average'] == original.loc[movie['title'], 'vote_average']
+        assert movie['popularity'] == original.loc[movie['title'], 'popularity']
+    votes = str(original.loc[title, 'vote_average'])
+    if original.loc[title, 'vote_count'] >= 2000:
+        assert movie_sys.votos_titulo(title)['message'].endswith(f"con un promedio de {votes}")
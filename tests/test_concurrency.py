@@ -0,0 +1,42 @@
+import asyncio
+import gc
+import time
+
+import pytest
+
+from Apps.concurrency import BoundedExecutor, ExecutorFull
+
+
+def test_cancelled_run_keeps_slot_until_thread_finishes():
+    executor = BoundedExecutor("test", 1, 0)
+
+    async def scenario():
+        task = asyncio.create_task(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # El hilo sigue durmiendo: el lugar sigue ocupado
+        with pytest.raises(ExecutorFull):
+            await executor.run(time.sleep, 0)
+        await asyncio.sleep(0.3)
+        assert executor.pending == 0
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+
+def test_stream_releases_slot_when_never_iterated():
+    executor = BoundedExecutor("test", 1, 0)
+
+    async def scenario():
+        stream = executor.stream(iter([1, 2]))
+        assert executor.pending == 1
+        del stream
+        gc.collect()
+        assert executor.pending == 0
+        assert [item async for item in executor.stream(iter([1, 2]))] == [1, 2]
+        assert executor.pending == 0
+
+    asyncio.run(scenario())
+    executor.shutdown()
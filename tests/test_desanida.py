@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from ETL_functs.desanida_ import desanida_column, extraer_directores, extraer_directores_rapido, extraer_nombres
+
+CASOS = [
+    "[{'id': 1, 'name': 'A'}, {'id': 2, 'name': \"O'Brien\"}]",
+    "{'id': 10, 'name': 'Colección'}",
+    "[]",
+    # Truncados o con texto de más: literal_eval falla y el resultado es NaN
+    "[{'id': 1, 'name': 'A'}",
+    "[{'id': 1, 'name': 'A'}, {'id': 2, 'name': 'B'",
+    "{'id': 10, 'name': 'Colección'",
+    "[{'id': 1, 'name': 'A'}] extra",
+    "[{'job': 'Director', 'name': 'D'}, {'job': 'Writer', 'name': 'W'}",
+]
+
+
+def _igual(a, b):
+    if isinstance(a, float) and np.isnan(a):
+        return isinstance(b, float) and np.isnan(b)
+    return a == b
+
+
+@pytest.mark.parametrize("texto", CASOS)
+def test_desanidado_rapido_igual_al_original(texto):
+    assert _igual(extraer_nombres(texto), desanida_column('name', texto))
+    assert _igual(extraer_nombres(texto, 1), desanida_column('name', texto, 1))
+    assert _igual(extraer_directores_rapido(texto), extraer_directores(texto))
@@ -0,0 +1,25 @@
+import numpy as np
+
+from Apps.description import DescriptionIndex, load_description_index, save_description_index
+from Apps.neighbors import build_content, build_tfidf_matrices
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import tipar_dataset
+
+
+def test_description_scores_match_sklearn_cosine(tmp_path):
+    movies_df = tipar_dataset(make_catalog(200, seed=3))
+    tfidf_matrix, _, (vectorizer, _) = build_tfidf_matrices(movies_df, return_vectorizers=True)
+    index = DescriptionIndex.from_vectorizer(vectorizer, tfidf_matrix, movies_df['id'])
+    path = str(tmp_path / 'description.npz')
+    save_description_index(path, index)
+    index = load_description_index(path)
+
+    documents = build_content(movies_df)
+    for text in ["space robot friendship", "a heist in the village", documents.iloc[5]]:
+        query = vectorizer.transform([text])
+        expected = (tfidf_matrix @ query.T).toarray().ravel() / np.linalg.norm(query.toarray())
+        np.testing.assert_allclose(index.scores(text), expected, atol=1e-5)
+        positions, scores = index.query(text, k=5)
+        np.testing.assert_allclose(scores, np.sort(expected)[::-1][:5], atol=1e-5)
+
+    assert index.query("zzzz qqqq", k=5)[0].size == 0
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from Apps.indexes import GenreBitset, PersonIndex, TrigramIndex, build_title_index, normalize_text
+
+
+def test_normalize_text_strips_accents_case_and_whitespace():
+    assert normalize_text("  Amélie   ÉTÉ\tcañón ") == "amelie ete canon"
+    assert normalize_text("Straße") == "strasse"
+    assert normalize_text(None) == ''
+    index = build_title_index(["Amélie", "amelie ", "Toy Story"])
+    assert index["amelie"] == [0, 1] and index["toy story"] == [2]
+
+
+def test_person_index_exact_and_prefix():
+    index = PersonIndex([
+        ["Tom Hanks", "Meg Ryan"],
+        ["Tom Hanks", "Tom Hanks"],
+        ["Tom Holland"],
+        ["Thomas Hanksford"],
+    ])
+    assert index.exact("tom  hanks") == "tom hanks"
+    assert index.movies["tom hanks"] == [0, 1]
+    assert index.exact("Tom") is None
+    # Prefijo del nombre completo o de cualquier palabra, más películas primero
+    assert index.prefix("tom h") == ["tom hanks", "tom holland"]
+    assert index.prefix("hanks") == ["tom hanks", "thomas hanksford"]
+    # Sin falsos positivos por subcadena en medio de una palabra
+    assert index.prefix("anks") == []
+    assert index.prefix("olla") == []
+    assert index.lookup("Ryan") == ("Meg Ryan", [0])
+    assert index.lookup("nadie") is None
+
+
+def test_trigram_index_ranks_closest_titles_first():
+    keys = ["toy story", "toy story 2", "the matrix", "story of toys"]
+    index = TrigramIndex(keys)
+    results = index.search("Toy Stroy")
+    assert results[0][0] == "toy story"
+    assert results[0][1] > results[1][1]
+    assert [key for key, _ in results[:2]] == ["toy story", "toy story 2"]
+    assert all(key != "the matrix" for key, _ in index.search("toy story", min_score=0.2))
+    assert index.search("zzzz") == []
+    assert len(index.search("toy", limit=1)) == 1
+
+
+def test_genre_bitset_jaccard_matches_pandas():
+    rng = np.random.default_rng(0)
+    genres = ["Action", "Comedy", "Drama", "Horror", "Romance", "Sci-Fi", "Thriller", "War", "Western"]
+    genre_lists = [list(rng.choice(genres, size=rng.integers(0, 4), replace=False)) for _ in range(150)]
+    popularity = rng.random(150)
+    vote_count = rng.integers(0, 1000, 150)
+    bitset = GenreBitset(genre_lists, popularity, vote_count)
+
+    multi_hot = pd.Series(genre_lists).explode().pipe(pd.get_dummies).groupby(level=0).max()
+    multi_hot = multi_hot.reindex(range(150), fill_value=False).astype(int)
+    for position in range(0, 150, 7):
+        intersection = multi_hot @ multi_hot.iloc[position]
+        union = multi_hot.sum(axis=1) + multi_hot.iloc[position].sum() - intersection
+        reference = pd.DataFrame({
+            'jaccard': intersection / union.where(union > 0, 1),
+            'popularity': popularity, 'vote_count': vote_count, 'position': range(150),
+        })
+        reference = reference[(intersection > 0) & (reference['position'] != position)]
+        reference = reference.sort_values(['jaccard', 'popularity', 'vote_count', 'position'],
+                                          ascending=[False, False, False, True])
+        assert bitset.similar(position, 10).tolist() == reference['position'].head(10).tolist()
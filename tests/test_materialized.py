@@ -0,0 +1,51 @@
+import shutil
+
+from Apps.materialized import build_recommendation_store
+from Apps.models2 import MovieSys
+from Apps.posters import PosterResolver
+
+
+def test_store_matches_live_recommendations(artifacts_dir, tmp_path):
+    movies_path = str(artifacts_dir / 'Datasets' / 'movies.parquet')
+    neighbors_path = str(artifacts_dir / 'Datasets' / 'neighbors.bin')
+    store_path = str(tmp_path / 'recommendations.sqlite')
+    build_recommendation_store(movies_path, neighbors_path, store_path, n_recommendations=8, processes=1)
+
+    live = MovieSys(movies_path, neighbors_path, PosterResolver())
+    served = MovieSys(movies_path, neighbors_path, PosterResolver(), recommendations_path=store_path)
+    assert served.materialized is not None
+    for title in live.movies_df['title'].iloc[:40]:
+        for n in (3, 8):
+            assert served.recomendacion(title, n, posters=False) == live.recomendacion(title, n, posters=False)
+    assert served.materialized.hits == 80
+
+
+def test_reloader_unchanged_after_startup_with_materialized_table(artifacts_dir, tmp_path, import_main):
+    shutil.copytree(artifacts_dir / 'Datasets', tmp_path / 'Datasets')
+    datasets = tmp_path / 'Datasets'
+    build_recommendation_store(str(datasets / 'movies.parquet'), str(datasets / 'neighbors.bin'),
+                               str(datasets / 'recommendations.sqlite'), processes=1)
+    main = import_main(tmp_path)
+    try:
+        assert main.movie_sys.materialized is not None
+        assert not main.reloader._changed()
+    finally:
+        main.cpu_executor.shutdown()
+        main.io_executor.shutdown()
+
+
+def test_reloader_picks_up_table_created_after_startup(artifacts_dir, tmp_path, import_main):
+    shutil.copytree(artifacts_dir / 'Datasets', tmp_path / 'Datasets')
+    datasets = tmp_path / 'Datasets'
+    main = import_main(tmp_path)
+    try:
+        assert main.movie_sys.materialized is None
+        assert not (datasets / 'recommendations.sqlite').exists()
+        build_recommendation_store(str(datasets / 'movies.parquet'), str(datasets / 'neighbors.bin'),
+                                   str(datasets / 'recommendations.sqlite'), processes=1)
+        assert main.reloader._changed()
+        assert main.reloader.reload()
+        assert main.movie_sys.materialized is not None
+    finally:
+        main.cpu_executor.shutdown()
+        main.io_executor.shutdown()
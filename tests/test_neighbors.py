@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from Apps.neighbors import build_neighbor_index, build_tfidf_matrices, load_neighbor_index, save_neighbor_index
+from Benchmarks.synthetic import make_catalog
+from ETL_functs.dataset_io import tipar_dataset
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    movies_df = tipar_dataset(make_catalog(200, seed=1))
+    return movies_df, *build_tfidf_matrices(movies_df)
+
+
+def test_neighbors_match_brute_force_cosine(catalog):
+    movies_df, tfidf_matrix, genres_matrix = catalog
+    k = 15
+    # Bloques chicos para ejercitar varias pasadas
+    index = build_neighbor_index(tfidf_matrix, genres_matrix, k=k, block_size=32, ids=movies_df['id'])
+    dense = (tfidf_matrix @ tfidf_matrix.T).toarray() + 0.25 * (genres_matrix @ genres_matrix.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+
+    assert index.indices.shape == (len(movies_df), k)
+    for row in range(len(movies_df)):
+        expected = np.sort(dense[row])[::-1][:k]
+        positions, scores = index.row(row)
+        assert row not in positions
+        # Los scores se guardan en float16
+        np.testing.assert_allclose(scores.astype(np.float64), expected, atol=2e-3)
+        np.testing.assert_allclose(dense[row, positions], expected, atol=1e-9)
+
+
+def test_ties_at_the_boundary_keep_lowest_positions():
+    # Todas las películas con el mismo contenido: todos los scores empatan
+    tfidf_matrix = np.ones((6, 2)) / np.sqrt(2)
+    index = build_neighbor_index(sp.csr_matrix(tfidf_matrix), sp.csr_matrix(tfidf_matrix), k=2)
+    assert index.indices.tolist() == [[1, 2], [0, 2], [0, 1], [0, 1], [0, 1], [0, 1]]
+
+
+def test_save_load_round_trip(catalog, tmp_path):
+    movies_df, tfidf_matrix, genres_matrix = catalog
+    index = build_neighbor_index(tfidf_matrix, genres_matrix, k=10, ids=movies_df['id'])
+    path = str(tmp_path / 'neighbors.bin')
+    save_neighbor_index(path, index)
+    loaded = load_neighbor_index(path)
+    assert loaded.k == 10 and len(loaded) == len(movies_df)
+    np.testing.assert_array_equal(loaded.indices, index.indices)
+    np.testing.assert_array_equal(loaded.scores, index.scores)
+    np.testing.assert_array_equal(loaded.ids, movies_df['id'].to_numpy())
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'neighbors.bin'
+    path.write_bytes(b'no es un indice' * 10)
+    with pytest.raises(ValueError):
+        load_neighbor_index(str(path))
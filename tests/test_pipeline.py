@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from Apps.catalog import load_overviews
+from Apps.neighbors import load_neighbor_index
+from Benchmarks.synthetic import make_raw_movies
+from ETL_functs.dataset_io import cargar_dataset
+from ETL_functs.pipeline import ejecutar
+from ETL_functs.text_store import TextStore, text_store_path
+
+
+def escribir_origen(directory, n_movies=120, seed=0):
+    raw = make_raw_movies(n_movies, seed=seed)
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_movies + 1).astype(str)
+    movies = raw.drop(columns=['cast', 'crew']).assign(
+        id=ids, title=[f"Movie {i}" for i in ids], imdb_id=[f"tt{int(i):07d}" for i in ids],
+        overview=[f"story about topic{rng.integers(30)} and topic{rng.integers(30)}" for _ in ids],
+        release_date=[f"{rng.integers(1970, 2020)}-01-01" for _ in ids],
+        budget=rng.integers(0, 10**6, n_movies).astype(str), revenue=rng.integers(0, 10**7, n_movies).astype(str),
+        popularity=rng.random(n_movies).astype(str), vote_average=rng.random(n_movies).astype(str),
+        vote_count=rng.integers(0, 100, n_movies).astype(str), original_language='en', status='Released',
+    )
+    credits = raw[['cast', 'crew']].assign(id=ids)
+    return movies, credits
+
+
+def correr(directory, movies, credits, **kwargs):
+    movies.to_csv(directory / 'movies.csv', index=False)
+    credits.to_csv(directory / 'credits.csv', index=False)
+    return ejecutar(str(directory / 'movies.csv'), str(directory / 'credits.csv'), str(directory / 'movies.parquet'),
+                    str(directory / 'neighbors.bin'), str(directory / 'estado'), tamano_bloque=25, k=10, **kwargs)
+
+
+def test_incremental_matches_full_rebuild_dataset(tmp_path):
+    movies, credits = escribir_origen(tmp_path)
+    assert correr(tmp_path, movies, credits) == 120
+
+    movies.loc[movies['id'].isin(['3', '7']), 'overview'] = "a completely new plot"
+    movies = movies[movies['id'] != '10']
+    n_movies = correr(tmp_path, movies, credits, umbral_reajuste=1.0)
+    incremental = cargar_dataset(str(tmp_path / 'movies.parquet'))
+    assert json.loads((tmp_path / 'estado' / 'ajuste.json').read_text())["cambios"] == 3
+    overviews = TextStore.open(text_store_path(str(tmp_path / 'movies.parquet')))
+    assert overviews.take(range(len(overviews))) == incremental['overview'].tolist()
+    assert load_neighbor_index(str(tmp_path / 'neighbors.bin')).ids.tolist() == incremental['id'].tolist()
+
+    completo = tmp_path / 'completo'
+    completo.mkdir()
+    assert correr(completo, movies, credits, completo=True) == n_movies
+    full = cargar_dataset(str(completo / 'movies.parquet'))
+    ordenar = lambda df: df.sort_values('id').reset_index(drop=True).astype(str)
+    pd.testing.assert_frame_equal(ordenar(incremental), ordenar(full[incremental.columns]))
+
+
+def test_changes_above_threshold_refit_vectorizers(tmp_path):
+    movies, credits = escribir_origen(tmp_path)
+    correr(tmp_path, movies, credits)
+    movies.loc[movies['id'].isin(['3', '7']), 'overview'] = "a completely new plot"
+    correr(tmp_path, movies, credits, umbral_reajuste=0.01)
+    assert json.loads((tmp_path / 'estado' / 'ajuste.json').read_text()) == {"filas": 120, "cambios": 0}
+
+
+def test_overviews_rejected_when_ids_differ(tmp_path):
+    movies_df = pd.DataFrame({'id': [1, 2, 3], 'overview': ["uno", "dos", "tres"]})
+    path = str(tmp_path / 'movies.parquet')
+    TextStore.from_values(movies_df['overview']).save(text_store_path(path), ids=movies_df['id'])
+    assert load_overviews(path, movies_df).mapped
+    # Misma cantidad de filas, otro orden: no se usa el archivo mapeado
+    reordenado = movies_df.iloc[[1, 0, 2]].reset_index(drop=True)
+    overviews = load_overviews(path, reordenado)
+    assert not overviews.mapped and overviews.take(range(3)) == ["dos", "uno", "tres"]
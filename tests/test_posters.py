@@ -0,0 +1,37 @@
+import pytest
+
+from Apps.posters import POSTER_NO_DISPONIBLE, OmdbBackend, OmdbError, PosterCache, PosterResolver
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def omdb_backend(monkeypatch, payload):
+    backend = OmdbBackend("clave")
+    monkeypatch.setattr(backend.session, "get", lambda *args, **kwargs: FakeResponse(payload))
+    return backend
+
+
+@pytest.mark.parametrize("error", ["Request limit reached!", "Invalid API key!"])
+def test_omdb_service_errors_are_not_cached(monkeypatch, error):
+    backend = omdb_backend(monkeypatch, {"Response": "False", "Error": error})
+    with pytest.raises(OmdbError):
+        backend.fetch("tt0000001")
+    cache = PosterCache()
+    assert PosterResolver(backend, cache).resolve("tt0000001") == POSTER_NO_DISPONIBLE
+    assert cache.get_many(["tt0000001"]) == {}
+
+
+def test_omdb_movie_not_found_is_cached_as_negative(monkeypatch):
+    backend = omdb_backend(monkeypatch, {"Response": "False", "Error": "Movie not found!"})
+    cache = PosterCache()
+    assert PosterResolver(backend, cache).resolve("tt0000001") == POSTER_NO_DISPONIBLE
+    assert cache.get_many(["tt0000001"]) == {"tt0000001": None}
@@ -0,0 +1,41 @@
+import numpy as np
+
+from Apps.ranking import top_n, top_n_rows
+
+
+def _reference(scores, n, exclude=None):
+    # Sort estable completo: mayor score primero, desempate por posición
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind='stable')
+    if exclude is not None:
+        order = order[~np.asarray(exclude)[order]]
+    return order[:n]
+
+
+def test_top_n_matches_stable_sort_with_ties_and_exclusions():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        scores = rng.integers(0, 5, size=rng.integers(1, 60)).astype(np.float32)
+        exclude = rng.random(scores.size) < 0.3
+        n = int(rng.integers(0, scores.size + 3))
+        np.testing.assert_array_equal(top_n(scores, n), _reference(scores, n))
+        np.testing.assert_array_equal(top_n(scores, n, exclude), _reference(scores, n, exclude))
+
+
+def test_top_n_edge_cases():
+    assert top_n([1.0, 2.0], 0).size == 0
+    assert top_n([1.0, 2.0], 5, exclude=[True, True]).size == 0
+    assert top_n([3.0, 1.0, 2.0], 10).tolist() == [0, 2, 1]
+
+
+def test_top_n_rows_orders_each_row_and_flags_excluded():
+    scores = np.array([[0.2, 0.9, 0.9, 0.1],
+                       [0.5, 0.4, 0.3, 0.2]])
+    exclude = np.array([[False, True, False, False],
+                        [True, True, True, False]])
+    columns, valid = top_n_rows(scores, 3, exclude)
+    assert columns.tolist() == [[2, 0, 3], [3, 0, 1]]
+    assert valid.tolist() == [[True, True, True], [True, False, False]]
+
+    columns, valid = top_n_rows(scores, 10)
+    assert columns.shape == (2, 4) and valid.all()
+    assert columns[0].tolist() == [1, 2, 0, 3]